@@ -6,13 +6,26 @@ from tkinter import messagebox, filedialog, ttk
 from PIL import Image, ImageTk
 import csv
 import datetime
-import time
 import threading
-import re
+import multiprocessing
 import os
-import pandas as pd
 import random
 
+from shotdoro import AnalysisEngine, DigitReader
+from shotdoro.batch import collect_videos, run_batch
+from shotdoro.checkpoint import checkpoint_path, read_checkpoint
+from shotdoro.ocr import estimated_calls_saved, prediction_hit_rate
+from shotdoro.ocr_cache import default_cache_path
+from shotdoro.telemetry import (SHOT_MARK, add_shot_column_streaming, find_time_column, is_time_like_column,
+                                load_telemetry, match_shots, read_csv_head)
+from shotdoro.updates import UpdateChannel
+
+# GUI refresh cadence for analysis progress (10 Hz)
+UPDATE_INTERVAL_MS = 100
+
+# Telemetry CSVs above this size are previewed from their first rows and merged in chunks
+STREAMING_BYTES = 256 * 1024 * 1024
+
 
 class VideoAmmoAnalyzer:
     def __init__(self):
@@ -30,9 +43,18 @@ class VideoAmmoAnalyzer:
         self.video_fps = 30
         self.analysis_running = False
         self.existing_csv_path = None
+        self.existing_csv_streaming = False  # larger than STREAMING_BYTES: merged chunk by chunk
+
+        # Headless analysis engine (created per run)
+        self.reader = DigitReader(upscale=4)
+        self.engine = None
+
+        # Worker -> GUI updates, applied by drain_updates on the Tk thread
+        self.updates = UpdateChannel()
 
         # Setup GUI
         self.setup_gui()
+        self.root.after(UPDATE_INTERVAL_MS, self.drain_updates)
 
         # Set Tesseract path (modify if needed)
         try:
@@ -73,6 +95,7 @@ class VideoAmmoAnalyzer:
         tk.Button(btn_frame2, text="🚀 Start Analysis", command=self.start_analysis, bg="orange",
                   font=("Arial", 12, "bold")).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame2, text="⏹️ Stop Analysis", command=self.stop_analysis, bg="red").pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame2, text="📚 Batch Folder", command=self.start_batch, bg="khaki").pack(side=tk.LEFT, padx=5)
 
         # Third row buttons (CSV related)
         btn_frame3 = tk.Frame(control_frame)
@@ -89,10 +112,50 @@ class VideoAmmoAnalyzer:
         self.skip_frames = tk.IntVar(value=1)
         tk.Spinbox(setting_frame, from_=1, to=10, textvariable=self.skip_frames, width=5).pack(side=tk.LEFT, padx=5)
 
+        # Adaptive sampling: widen the stride up to Max Skip while the ammo count is stable
+        tk.Label(setting_frame, text="Max Skip:").pack(side=tk.LEFT, padx=(10, 0))
+        self.max_skip_frames = tk.IntVar(value=1)
+        tk.Spinbox(setting_frame, from_=1, to=60, textvariable=self.max_skip_frames, width=4).pack(side=tk.LEFT, padx=5)
+
+        # OCR change gate (0 = OCR every analyzed frame)
+        tk.Label(setting_frame, text="OCR Gate:").pack(side=tk.LEFT, padx=(10, 0))
+        self.gate_threshold = tk.IntVar(value=0)
+        tk.Spinbox(setting_frame, from_=0, to=50, textvariable=self.gate_threshold, width=4).pack(side=tk.LEFT, padx=5)
+
+        # Persist the OCR memo in the user cache dir (off: in-memory for this run only)
+        self.ocr_cache = tk.BooleanVar(value=False)
+        tk.Checkbutton(setting_frame, text="💾 OCR Cache", variable=self.ocr_cache).pack(side=tk.LEFT, padx=5)
+
+        # Self-trained glyph templates (Tesseract only as fallback)
+        self.glyph_templates = tk.BooleanVar(value=False)
+        tk.Checkbutton(setting_frame, text="🔤 Glyph Templates", variable=self.glyph_templates).pack(side=tk.LEFT, padx=5)
+
+        # Check the likely next values (same, one less, reload) before running OCR
+        self.value_prediction = tk.BooleanVar(value=False)
+        tk.Checkbutton(setting_frame, text="🔮 Predict Values", variable=self.value_prediction).pack(side=tk.LEFT, padx=5)
+
+        # Persistent in-process Tesseract engines (falls back to pytesseract)
+        self.fast_ocr = tk.BooleanVar(value=False)
+        tk.Checkbutton(setting_frame, text="⚡ In-process OCR", variable=self.fast_ocr).pack(side=tk.LEFT, padx=5)
+
+        # Threshold/psm cascade order: fixed (off), reordered by hit rate, or pinned after warm-up
+        tk.Label(setting_frame, text="🧠 Adaptive OCR:").pack(side=tk.LEFT, padx=(10, 0))
+        self.adaptive_ocr = tk.StringVar(value='off')
+        ttk.Combobox(setting_frame, textvariable=self.adaptive_ocr, values=('off', 'reorder', 'pin'),
+                     state='readonly', width=8).pack(side=tk.LEFT, padx=5)
+
+        # Per-stage timing, saved as <video>_profile.json after every run
+        self.stage_profile = tk.BooleanVar(value=False)
+        tk.Checkbutton(setting_frame, text="⏱️ Stage Profile", variable=self.stage_profile).pack(side=tk.LEFT, padx=5)
+
         # Alert settings
         self.sound_alert = tk.BooleanVar(value=True)
         tk.Checkbutton(setting_frame, text="🔊 Shot Detection Alert", variable=self.sound_alert).pack(side=tk.LEFT, padx=10)
 
+        # Keep parsed telemetry CSVs as Parquet sidecars for instant reloads (needs pyarrow)
+        self.csv_sidecar = tk.BooleanVar(value=False)
+        tk.Checkbutton(setting_frame, text="📦 CSV Sidecar", variable=self.csv_sidecar).pack(side=tk.LEFT, padx=5)
+
         # Time tolerance setting
         tk.Label(setting_frame, text="Time Tolerance(sec):").pack(side=tk.LEFT, padx=(20, 0))
         self.time_tolerance = tk.DoubleVar(value=0.1)
@@ -169,32 +232,30 @@ class VideoAmmoAnalyzer:
 
         if file_path:
             try:
-                # Try CSV file with multiple encodings
-                df = None
-                encodings = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr', 'latin1']
-
-                for encoding in encodings:
-                    try:
-                        df = pd.read_csv(file_path, encoding=encoding)
-                        break
-                    except:
-                        continue
+                # Large logs: only the first rows are parsed here, the merge streams the rest
+                streaming = os.path.getsize(file_path) > STREAMING_BYTES
 
-                if df is None:
+                # Encoding sniffed from the first bytes, parsed once and cached for the merge
+                try:
+                    if streaming:
+                        df, _ = read_csv_head(file_path)
+                        time_column = self.find_time_column(df)
+                    else:
+                        df, time_column, _ = load_telemetry(file_path, sidecar=self.csv_sidecar.get())
+                except ValueError:
                     messagebox.showerror("Error", "Cannot read CSV file. Please check the file format.")
                     return
 
                 self.existing_csv_path = file_path
-
-                # Improved automatic time column detection
-                time_column = self.find_time_column(df)
+                self.existing_csv_streaming = streaming
 
                 if time_column:
+                    rows = f"first {len(df)} rows previewed, streamed" if streaming else f"rows: {len(df)}"
                     self.csv_info_label.config(
-                        text=f"Loaded CSV: {os.path.basename(file_path)} (rows: {len(df)}, time col: {time_column})",
+                        text=f"Loaded CSV: {os.path.basename(file_path)} ({rows}, time col: {time_column})",
                         fg="green"
                     )
-                    self.result_text.insert(tk.END, f"✅ CSV loaded successfully: {len(df)} rows, time column: '{time_column}'\n")
+                    self.result_text.insert(tk.END, f"✅ CSV loaded successfully: {rows}, time column: '{time_column}'\n")
 
                     # Auto display CSV preview
                     try:
@@ -218,63 +279,12 @@ class VideoAmmoAnalyzer:
                 self.existing_csv_path = None
 
     def find_time_column(self, df):
-        """Improved automatic time column detection - prioritize columns with changing values"""
-
-        # 1. Check 'time' column first (exact name)
-        if 'time' in df.columns:
-            col = 'time'
-            if pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > 1:
-                return col
-
-        # 2. Find 'time' related column names (changing values only)
-        for col in df.columns:
-            if 'time' in col.lower():
-                if pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > 1:
-                    # Check if it has time-like increasing pattern
-                    if self.is_time_like_column(df[col]):
-                        return col
-
-        # 3. Check column f (6th column) - original logic
-        if len(df.columns) > 5:
-            col = df.columns[5]
-            if pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > 1:
-                if self.is_time_like_column(df[col]):
-                    return col
-
-        # 4. Find numeric data columns with changing values
-        for col in df.columns:
-            if pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > 1:
-                # Check if data looks like time (non-negative and increasing pattern)
-                if self.is_time_like_column(df[col]):
-                    return col
-
-        return None
+        """Improved automatic time column detection - see shotdoro.telemetry"""
+        return find_time_column(df)
 
     def is_time_like_column(self, series):
         """Helper function to determine if column is time-like"""
-        try:
-            # Basic condition: numeric and values change
-            if not pd.api.types.is_numeric_dtype(series) or series.nunique() <= 1:
-                return False
-
-            # If all values are same, not a time column
-            if series.min() == series.max():
-                return False
-
-            # Values should be non-negative
-            if series.min() < 0:
-                return False
-
-            # Check if mostly increasing pattern (time characteristic)
-            diff = series.diff().dropna()
-            if len(diff) > 0:
-                positive_diff_ratio = (diff >= 0).sum() / len(diff)
-                return positive_diff_ratio > 0.8  # 80% or more increasing
-
-            return True
-
-        except:
-            return False
+        return is_time_like_column(series)
 
     def show_csv_preview(self, df, time_column):
         """Display CSV preview"""
@@ -316,48 +326,33 @@ class VideoAmmoAnalyzer:
             messagebox.showwarning("Warning", "No shot analysis data. Please run video analysis first.")
             return
 
-        try:
-            # Load existing CSV - prevent encoding errors
-            df = None
-            encodings = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr', 'latin1']
-
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(self.existing_csv_path, encoding=encoding)
-                    break
-                except:
-                    continue
+        if self.existing_csv_streaming:
+            self.add_shot_times_streaming()
+            return
 
-            if df is None:
+        try:
+            # Existing CSV as parsed by load_existing_csv (re-parsed only if the file changed)
+            try:
+                df, time_column, _ = load_telemetry(self.existing_csv_path, sidecar=self.csv_sidecar.get())
+            except ValueError:
                 messagebox.showerror("Error", "Cannot read CSV file.")
                 return
 
-            time_column = self.find_time_column(df)
-
             if not time_column:
                 messagebox.showerror("Error", "Cannot find time column.")
                 return
 
-            # Add shot time column (reset if already exists)
-            df['shot_time'] = ''
-
-            # Match with shot data
+            # Match with shot data (one sort + binary searches instead of a full scan per shot)
             tolerance = self.time_tolerance.get()
-            matched_count = 0
-            shot_details = []
+            shot_times = [shot['time_seconds'] for shot in self.shot_data]
+            matched, counts = match_shots(df[time_column].to_numpy(), shot_times, tolerance)
 
-            for i, shot in enumerate(self.shot_data):
-                shot_time = shot['time_seconds']
+            # Add shot time column (reset if already exists) - on a copy, the parsed table is cached
+            df = df.assign(shot_time=np.where(matched, SHOT_MARK, ''))
 
-                # Find rows within time tolerance
-                time_diff = abs(df[time_column] - shot_time)
-                matching_rows = time_diff <= tolerance
-
-                if matching_rows.any():
-                    df.loc[matching_rows, 'shot_time'] = 'O'
-                    matched_rows_count = len(df[matching_rows])
-                    matched_count += matched_rows_count
-                    shot_details.append(f"Shot{i + 1}: {shot_time:.3f}s → {matched_rows_count} rows matched")
+            matched_count = int(counts.sum())
+            shot_details = [f"Shot{i + 1}: {shot_time:.3f}s → {count} rows matched"
+                            for i, (shot_time, count) in enumerate(zip(shot_times, counts)) if count]
 
             # Save results
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -418,6 +413,54 @@ class VideoAmmoAnalyzer:
             messagebox.showerror("Error", error_msg)
             self.result_text.insert(tk.END, f"❌ Error: {error_msg}\n")
 
+    def add_shot_times_streaming(self):
+        """Add shot times to a CSV too large to load - the file is copied chunk by chunk"""
+        save_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Save CSV with shot times"
+        )
+        if not save_path:
+            return
+        if not save_path.endswith('.csv'):
+            save_path = save_path + '.csv'
+
+        tolerance = self.time_tolerance.get()
+        shot_times = [shot['time_seconds'] for shot in self.shot_data]
+
+        def on_chunk(rows):
+            self.status_label.config(text=f"Adding shot times... {rows:,} rows written")
+            self.root.update_idletasks()
+
+        try:
+            result = add_shot_column_streaming(self.existing_csv_path, save_path, shot_times, tolerance,
+                                               on_chunk=on_chunk)
+        except Exception as e:
+            messagebox.showerror("Error", f"CSV processing error:\n{e}")
+            self.result_text.insert(tk.END, f"❌ Error: {e}\n")
+            return
+
+        shot_details = [f"Shot{i + 1}: {shot_time:.3f}s → {count} rows matched"
+                        for i, (shot_time, count) in enumerate(zip(shot_times, result['counts'])) if count]
+
+        summary = f"\n{'=' * 60}\n"
+        summary += "📊 Shot times added successfully!\n"
+        summary += f"📁 Original CSV: {os.path.basename(self.existing_csv_path)} ({result['rows']} rows, streamed)\n"
+        summary += f"🎯 Detected shots: {len(self.shot_data)}\n"
+        summary += f"✅ Matched rows: {result['matched']}\n"
+        summary += f"⏰ Time tolerance: ±{tolerance}s\n"
+        summary += f"💾 Save path: {save_path}\n\n"
+        summary += "📋 Matching details:\n"
+        for detail in shot_details[:5]:  # Show first 5 only
+            summary += f"  {detail}\n"
+        if len(shot_details) > 5:
+            summary += f"  ... and {len(shot_details) - 5} more\n"
+        summary += f"{'=' * 60}\n"
+
+        self.status_label.config(text=f"Shot times added: {result['matched']} rows matched")
+        self.result_text.insert(tk.END, summary)
+        self.result_text.see(tk.END)
+
     def load_video(self):
         """Load video and extract sample frames"""
         file_path = filedialog.askopenfilename(
@@ -909,150 +952,150 @@ class VideoAmmoAnalyzer:
                 pass
 
     def extract_number_from_region(self, frame, region):
-        """Extract number using OCR - improved version"""
-        if region is None:
-            return None
+        """Extract number using OCR - delegates to the analysis engine reader"""
+        return self.reader.read(frame, region)
+
+    def reader_options(self):
+        """DigitReader keyword arguments from the settings widgets"""
+        use_cache = self.ocr_cache.get()
+        return {
+            'upscale': 4,
+            'gate_threshold': self.gate_threshold.get() or None,
+            'cache_size': 4096,
+            'cache_path': default_cache_path() if use_cache else None,
+            'glyphs': self.glyph_templates.get(),
+            'predict': self.value_prediction.get(),
+            'backend': 'capi' if self.fast_ocr.get() else 'pytesseract',
+            'adaptive': None if self.adaptive_ocr.get() == 'off' else self.adaptive_ocr.get(),
+        }
 
-        x1, y1, x2, y2 = region
-        roi = frame[y1:y2, x1:x2]
+    def create_engine(self, resume=False):
+        """Reader and engine configured from the settings widgets (GUI thread)"""
+        self.reader = DigitReader(**self.reader_options())
+        return AnalysisEngine(
+            self.video_path, self.current_ammo_region, self.total_ammo_region,
+            skip_frames=self.skip_frames.get(),
+            max_skip_frames=self.max_skip_frames.get(),
+            reader=self.reader,
+            on_ammo=self.on_ammo_read,
+            on_shot=self.on_shot_detected,
+            on_progress=self.on_analysis_progress,
+            profile_path=os.path.splitext(self.video_path)[0] + '_profile.json' if self.stage_profile.get() else None,
+            checkpoint_path=self.checkpoint_file(),
+            resume=resume,
+        )
 
-        if roi.size == 0:
+    def checkpoint_file(self):
+        """Checkpoint sidecar of the current video (None if its folder is not writable)"""
+        if not os.access(os.path.dirname(os.path.abspath(self.video_path)), os.W_OK):
             return None
-
-        try:
-            # Enhanced image preprocessing
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-
-            # Enlarge for better OCR accuracy
-            if roi.shape[0] < 50 or roi.shape[1] < 50:
-                gray = cv2.resize(gray, None, fx=4, fy=4, interpolation=cv2.INTER_CUBIC)
-
-            # Noise removal and binarization
-            gray = cv2.medianBlur(gray, 3)
-
-            # Try multiple thresholds
-            thresholds = [
-                cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
-                cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)[1],
-                cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
-            ]
-
-            # OCR settings
-            configs = [
-                r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789',
-                r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789',
-                r'--oem 3 --psm 13 -c tessedit_char_whitelist=0123456789'
-            ]
-
-            for thresh in thresholds:
-                # Morphological operations
-                kernel = np.ones((2, 2), np.uint8)
-                thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-                thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-
-                for config in configs:
-                    try:
-                        text = pytesseract.image_to_string(thresh, config=config)
-                        numbers = re.findall(r'\d+', text.strip())
-                        if numbers:
-                            return int(numbers[0])
-                    except:
-                        continue
-
-        except Exception as e:
-            pass
-
-        return None
+        return checkpoint_path(self.video_path)
 
     def analyze_video(self):
-        """Video analysis - keep existing method"""
-        if not self.current_ammo_region:
-            messagebox.showwarning("Warning", "Please set current ammo region first.")
-            return
-
-        cap = cv2.VideoCapture(self.video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-
+        """Video analysis - runs the headless engine (worker thread, reports through self.updates)"""
         self.shot_data = []
-        previous_ammo = None
-        frame_count = 0
-        skip_frames = self.skip_frames.get()
-
-        self.progress_bar['maximum'] = total_frames
-        start_time = time.time()
-
-        while self.analysis_running and cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
 
-            frame_count += 1
-
-            if frame_count % skip_frames != 0:
-                continue
-
-            self.progress_bar['value'] = frame_count
-
-            current_ammo = self.extract_number_from_region(frame, self.current_ammo_region)
-            total_ammo = self.extract_number_from_region(frame, self.total_ammo_region)
-
-            self.root.after(0, self.update_ammo_display, total_ammo, current_ammo, frame_count)
-
-            # Shot detection
-            if current_ammo is not None and previous_ammo is not None:
-                if current_ammo < previous_ammo:
-                    time_seconds = frame_count / fps
-                    shot_time = f"{int(time_seconds // 60):02d}:{time_seconds % 60:06.3f}"
-
-                    self.shot_data.append({
-                        'frame': frame_count,
-                        'time': shot_time,
-                        'time_seconds': round(time_seconds, 3),
-                        'total_ammo': total_ammo if total_ammo else '-',
-                        'current_ammo': current_ammo,
-                        'previous_ammo': previous_ammo,
-                        'shots_fired': previous_ammo - current_ammo
-                    })
-
-                    result = f"🎯 {len(self.shot_data):2d}. {shot_time} | {previous_ammo}→{current_ammo} ({previous_ammo - current_ammo} shots)\n"
-                    self.result_text.insert(tk.END, result)
-                    self.result_text.see(tk.END)
-
-                    if self.sound_alert.get():
-                        self.play_alert_sound()
-
-                    self.root.after(0, self.update_shot_count, len(self.shot_data))
-                    self.root.update()
-
-            if current_ammo is not None:
-                previous_ammo = current_ammo
-
-            if frame_count % 100 == 0:
-                elapsed = time.time() - start_time
-                fps_actual = frame_count / elapsed if elapsed > 0 else 0
-                self.status_label.config(
-                    text=f"Analyzing... {frame_count}/{total_frames} ({fps_actual:.1f} FPS)"
-                )
-                self.root.update()
-
-        cap.release()
+        try:
+            self.shot_data = self.engine.run()
+        except Exception as e:
+            self.updates.send('status', f"Analysis error: {e}")
+            self.analysis_running = False
+            return
 
+        summary = self.engine.summary
+        if not summary['completed'] and summary.get('checkpoints') is not None:
+            self.updates.send('log', f"💾 Checkpoint saved at frame {self.engine.last_emitted} "
+                                     f"({len(self.shot_data)} shots) - start again to resume\n")
         if self.analysis_running:
-            elapsed = time.time() - start_time
-            self.status_label.config(
-                text=f"Analysis complete! {len(self.shot_data)} shots detected (time: {elapsed:.1f}s)"
-            )
-
-            summary = f"\n{'=' * 50}\n"
-            summary += f"📊 Analysis complete: {len(self.shot_data)} shots detected\n"
-            summary += f"⏱️ Analysis time: {elapsed:.1f}s\n"
-            summary += f"🎬 Total frames: {total_frames} (FPS: {fps:.1f})\n"
-            summary += f"{'=' * 50}\n"
-            self.result_text.insert(tk.END, summary)
+            elapsed = summary['elapsed']
+            self.updates.post('progress', summary['frames_decoded'], summary['total_frames'], None)
+            self.updates.send('status', f"Analysis complete! {len(self.shot_data)} shots detected (time: {elapsed:.1f}s)")
+
+            summary_text = f"\n{'=' * 50}\n"
+            summary_text += f"📊 Analysis complete: {len(self.shot_data)} shots detected\n"
+            summary_text += f"⏱️ Analysis time: {elapsed:.1f}s\n"
+            summary_text += f"🎬 Total frames: {summary['total_frames']} (FPS: {summary['video_fps']:.1f})\n"
+            if summary.get('resumed_from'):
+                summary_text += f"💾 Resumed from frame {summary['resumed_from']}\n"
+            if self.engine.max_skip_frames and self.engine.max_skip_frames > self.engine.skip_frames:
+                summary_text += f"📏 Average stride: {summary['average_stride']:.2f} frames\n"
+            combos = summary['ocr']['combos']
+            top = [name for name in summary['combo_order'] if combos[name]['hits']][:3]
+            if top:
+                summary_text += "🧮 OCR hits: " + ", ".join(
+                    f"{name} {combos[name]['hits']}/{combos[name]['attempts']}" for name in top) + "\n"
+            if summary['ocr']['cache_hits']:
+                summary_text += f"💾 OCR cache: {summary['ocr']['cache_hits']} hits\n"
+            if summary['ocr']['predict_hits'] or summary['ocr']['predict_misses']:
+                summary_text += (f"🔮 Prediction: {summary['ocr']['predict_hits']} hits, "
+                                 f"{summary['ocr']['predict_misses']} misses "
+                                 f"({prediction_hit_rate(summary['ocr']):.0%} hit rate)\n")
+            if summary['ocr']['glyph_hits']:
+                summary_text += (f"🔤 Glyph templates: {summary['ocr']['glyph_hits']} hits, "
+                                 f"{summary['ocr']['glyph_fallbacks']} fallbacks\n")
+            if summary['ocr']['total_skips']:
+                summary_text += (f"🎒 Total ammo: read on {summary['ocr']['total_reads']} frames, "
+                                 f"reused on {summary['ocr']['total_skips']}\n")
+            if summary['ocr']['gate_skips']:
+                summary_text += (f"🚦 OCR gate: {summary['ocr']['gate_skips']} reads skipped "
+                                 f"(~{estimated_calls_saved(summary['ocr'])} OCR calls saved)\n")
+            if summary.get('profile'):
+                stages = summary['profile']['stages']
+                slowest = sorted(stages, key=lambda stage: -stages[stage]['total_s'])[:3]
+                summary_text += f"⏱️ Profile ({summary['profile']['bound']}-bound): " + ", ".join(
+                    f"{stage} {stages[stage]['total_s']:.1f}s p95 {stages[stage]['p95_ms']:.1f}ms" for stage in slowest) + "\n"
+                summary_text += f"   saved to {os.path.basename(self.engine.profile_path)}\n"
+            summary_text += f"{'=' * 50}\n"
+            self.updates.send('log', summary_text)
 
         self.analysis_running = False
 
+    def on_ammo_read(self, total_ammo, current_ammo, frame_count):
+        """Engine callback: new ammo reading (only the latest one reaches the display)"""
+        self.updates.post('ammo', total_ammo, current_ammo, frame_count)
+
+    def on_shot_detected(self, shot, shot_count):
+        """Engine callback: shot detected"""
+        self.updates.send('shot', shot, shot_count)
+
+    def on_analysis_progress(self, frame_count, total_frames, fps_actual):
+        """Engine callback: periodic progress"""
+        self.updates.post('progress', frame_count, total_frames, fps_actual)
+
+    def drain_updates(self):
+        """Apply queued worker updates on the GUI thread, UPDATE_INTERVAL_MS apart"""
+        lines = []
+        shot_count = None
+
+        for kind, args in self.updates.drain():
+            if kind == 'shot':
+                shot, shot_count = args
+                lines.append(f"🎯 {shot_count:2d}. {shot['time']} | {shot['previous_ammo']}→{shot['current_ammo']} "
+                             f"({shot['shots_fired']} shots)\n")
+            elif kind == 'log':
+                lines.append(args[0])
+            elif kind == 'ammo':
+                self.update_ammo_display(*args)
+            elif kind == 'progress':
+                frame_count, total_frames, fps_actual = args
+                self.progress_bar['maximum'] = total_frames
+                self.progress_bar['value'] = frame_count
+                if fps_actual is not None:
+                    self.status_label.config(text=f"Analyzing... {frame_count}/{total_frames} ({fps_actual:.1f} FPS)")
+            elif kind == 'status':
+                self.status_label.config(text=args[0])
+
+        # Log lines and shots of one interval, in arrival order: one text insert, one alert
+        if lines:
+            self.result_text.insert(tk.END, ''.join(lines))
+            self.result_text.see(tk.END)
+        if shot_count is not None:
+            self.update_shot_count(shot_count)
+            if self.sound_alert.get():
+                self.play_alert_sound()
+
+        self.root.after(UPDATE_INTERVAL_MS, self.drain_updates)
+
     def update_ammo_display(self, total_ammo, current_ammo, frame_count):
         """Update real-time ammo info display"""
         total_str = str(total_ammo) if total_ammo is not None else "?"
@@ -1075,16 +1118,76 @@ class VideoAmmoAnalyzer:
             messagebox.showwarning("Warning", "Please set current ammo region.")
             return
 
+        # Offer to continue a stopped or crashed run of the same video
+        resume = False
+        state = read_checkpoint(checkpoint_path(self.video_path))
+        if state and state['frame'] > 0:
+            resume = messagebox.askyesno(
+                "Resume",
+                f"A previous analysis of this video stopped at frame {state['frame']} "
+                f"({len(state['shots'])} shots).\n\nResume from there?"
+            )
+
+        self.engine = self.create_engine(resume=resume)
         self.analysis_running = True
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END, "🚀 Analysis started...\n\n")
+        if self.fast_ocr.get() and self.reader.backend.name != 'capi':
+            self.result_text.insert(tk.END, "⚠️ libtesseract not found - in-process OCR unavailable, using pytesseract\n\n")
 
         self.analysis_thread = threading.Thread(target=self.analyze_video, daemon=True)
         self.analysis_thread.start()
 
+    def start_batch(self):
+        """Analyze every video of a folder with the current regions (one process pool for all)"""
+        if not self.current_ammo_region:
+            messagebox.showwarning("Warning", "Please set current ammo region.")
+            return
+
+        folder = filedialog.askdirectory(title="Select a folder of videos with the same HUD layout")
+        if not folder:
+            return
+        videos = collect_videos(folder)
+        if not videos:
+            messagebox.showwarning("Warning", "No video files found in this folder.")
+            return
+
+        self.result_text.insert(tk.END, f"📚 Batch started: {len(videos)} videos in {folder}\n")
+        self.result_text.see(tk.END)
+        options = {
+            'reader_options': self.reader_options(),
+            'skip_frames': self.skip_frames.get(),
+            'max_skip_frames': self.max_skip_frames.get(),
+        }
+        threading.Thread(target=self.run_batch_folder, args=(folder, videos, options), daemon=True).start()
+
+    def run_batch_folder(self, folder, videos, options):
+        """Worker thread: run the batch, report every finished video through self.updates"""
+        def on_job(job, done, total):
+            name = os.path.basename(job['video'])
+            if job['status'] == 'failed':
+                self.updates.send('log', f"❌ [{done}/{total}] {name}: {job['error']}\n")
+            else:
+                self.updates.send('log', f"✅ [{done}/{total}] {name}: {job['shots']} shots\n")
+            self.updates.post('progress', done, total, None)
+            self.updates.send('status', f"Batch: {done}/{total} videos done")
+
+        try:
+            _, summary = run_batch(videos, self.current_ammo_region, self.total_ammo_region,
+                                   index_path=os.path.join(folder, 'batch_index.csv'), on_job=on_job, **options)
+        except Exception as e:
+            self.updates.send('status', f"Batch error: {e}")
+            return
+
+        self.updates.send('log', f"📚 Batch complete: {summary['shots']} shots in {summary['videos']} videos, "
+                                 f"{summary['failed']} failed\n💾 Index: {summary['index']}\n")
+        self.updates.send('status', f"Batch complete ({summary['elapsed']:.0f}s)")
+
     def stop_analysis(self):
         """Stop analysis"""
         self.analysis_running = False
+        if self.engine:
+            self.engine.stop()
         self.status_label.config(text="Status: Analysis stopped")
 
     def run(self):
@@ -1093,6 +1196,9 @@ class VideoAmmoAnalyzer:
 
 
 if __name__ == "__main__":
+    # Batch workers re-launch the packaged executable
+    multiprocessing.freeze_support()
+
     try:
         import cv2
         import pytesseract
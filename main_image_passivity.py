@@ -1,17 +1,19 @@
 import cv2
-import numpy as np
 import pytesseract
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 from PIL import Image, ImageTk
-import csv
 import datetime
-import time
 import threading
-import re
 import os
 import pandas as pd
 
+from shotdoro import AnalysisEngine, DigitReader, write_shots_csv
+from shotdoro.updates import UpdateChannel
+
+# 분석 진행 상황 GUI 갱신 주기 (10 Hz)
+UPDATE_INTERVAL_MS = 100
+
 
 class VideoAmmoAnalyzer:
     def __init__(self):
@@ -29,8 +31,16 @@ class VideoAmmoAnalyzer:
         self.analysis_running = False
         self.existing_csv_path = None  # 추가: 기존 CSV 경로
 
+        # 분석 엔진 (빠른 분석: Otsu + psm 8 단일 시도, OCR 결과 메모리 캐시 사용)
+        self.reader = DigitReader(upscale=3, thresholds=('otsu',), psm_modes=(8,), cache_size=4096)
+        self.engine = None
+
+        # 작업 스레드 -> GUI 업데이트 (drain_updates가 Tk 스레드에서 적용)
+        self.updates = UpdateChannel()
+
         # GUI 설정
         self.setup_gui()
+        self.root.after(UPDATE_INTERVAL_MS, self.drain_updates)
 
         # Tesseract 경로 설정 (필요시 수정)
         pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
@@ -466,153 +476,104 @@ class VideoAmmoAnalyzer:
                 pass
 
     def extract_number_from_region(self, frame, region):
-        if region is None:
-            return None
-
-        x1, y1, x2, y2 = region
-        roi = frame[y1:y2, x1:x2]
-
-        if roi.size == 0:
-            return None
-
-        # 이미지 전처리 - 더 강화된 버전
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-
-        # 크기 확대로 OCR 정확도 향상
-        if roi.shape[0] < 50 or roi.shape[1] < 50:
-            gray = cv2.resize(gray, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
-
-        # 노이즈 제거 및 이진화
-        gray = cv2.medianBlur(gray, 3)
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-        # 형태학적 연산으로 텍스트 정리
-        kernel = np.ones((2, 2), np.uint8)
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-
-        # OCR 설정 최적화
-        custom_config = r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789'
-
-        try:
-            text = pytesseract.image_to_string(thresh, config=custom_config)
-            # 숫자만 추출
-            numbers = re.findall(r'\d+', text.strip())
-            if numbers:
-                return int(numbers[0])
-        except:
-            pass
-
-        return None
+        # 분석 엔진의 OCR 리더에 위임
+        return self.reader.read(frame, region)
+
+    def create_engine(self):
+        """설정값으로 분석 엔진 생성 (GUI 스레드)"""
+        return AnalysisEngine(
+            self.video_path, self.current_ammo_region, self.total_ammo_region,
+            skip_frames=self.skip_frames.get(),
+            reader=self.reader,
+            on_ammo=self.on_ammo_read,
+            on_shot=self.on_shot_detected,
+            on_progress=self.on_analysis_progress,
+        )
 
     def analyze_video(self):
-        if not self.current_ammo_region:
-            messagebox.showwarning("경고", "현재 총알 수 영역을 먼저 설정해주세요.")
-            return
-
-        cap = cv2.VideoCapture(self.video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-
+        """작업 스레드: 엔진 실행 (GUI는 self.updates를 통해서만 갱신)"""
         self.shot_data = []
-        previous_ammo = None
-        frame_count = 0
-        skip_frames = self.skip_frames.get()
-
-        self.progress_bar['maximum'] = total_frames
-
-        start_time = time.time()
-
-        while self.analysis_running and cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            frame_count += 1
-
-            # 프레임 건너뛰기
-            if frame_count % skip_frames != 0:
-                continue
-
-            # 진행률 업데이트
-            self.progress_bar['value'] = frame_count
-
-            # 현재 탄약 수 추출
-            current_ammo = self.extract_number_from_region(frame, self.current_ammo_region)
-            total_ammo = self.extract_number_from_region(frame, self.total_ammo_region)
-
-            # 실시간 탄약 정보 업데이트
-            self.root.after(0, self.update_ammo_display, total_ammo, current_ammo, frame_count)
-
-            # 사격 감지
-            if current_ammo is not None and previous_ammo is not None:
-                if current_ammo < previous_ammo:
-                    # 사격 감지!
-                    time_seconds = frame_count / fps
-                    shot_time = f"{int(time_seconds // 60):02d}:{time_seconds % 60:06.3f}"
-
-                    self.shot_data.append({
-                        'frame': frame_count,
-                        'time': shot_time,
-                        'time_seconds': round(time_seconds, 3),
-                        'total_ammo': total_ammo if total_ammo else '-',
-                        'current_ammo': current_ammo,
-                        'previous_ammo': previous_ammo,
-                        'shots_fired': previous_ammo - current_ammo
-                    })
 
-                    # 🎯 사격 감지 알림 및 결과 표시
-                    result = f"🎯 {len(self.shot_data):2d}. {shot_time} | {previous_ammo}→{current_ammo} ({previous_ammo - current_ammo}발)\n"
-                    self.result_text.insert(tk.END, result)
-                    self.result_text.see(tk.END)
-
-                    # 알림음 재생
-                    if self.sound_alert.get():
-                        self.play_alert_sound()
-
-                    # 사격 횟수 업데이트
-                    self.root.after(0, self.update_shot_count, len(self.shot_data))
-
-                    self.root.update()
-            else:
-                # 프레임별 탄약 정보만 표시 (사격 없을 때)
-                if current_ammo is not None or total_ammo is not None:
-                    info = f"프레임 {frame_count:5d} | 총탄:{total_ammo if total_ammo else '?'} 현재:{current_ammo if current_ammo else '?'}\n"
-                    # 너무 많은 로그를 방지하기 위해 10프레임마다만 표시
-                    if frame_count % (skip_frames * 10) == 0:
-                        self.result_text.insert(tk.END, info)
-                        self.result_text.see(tk.END)
-
-            if current_ammo is not None:
-                previous_ammo = current_ammo
-
-            # 상태 업데이트 (100프레임마다)
-            if frame_count % 100 == 0:
-                elapsed = time.time() - start_time
-                fps_actual = frame_count / elapsed if elapsed > 0 else 0
-                self.status_label.config(
-                    text=f"분석 중... {frame_count}/{total_frames} ({fps_actual:.1f} FPS)"
-                )
-                self.root.update()
-
-        cap.release()
+        try:
+            self.shot_data = self.engine.run()
+        except Exception as e:
+            self.updates.send('status', f"분석 오류: {e}")
+            self.analysis_running = False
+            return
 
+        summary = self.engine.summary
         if self.analysis_running:
-            elapsed = time.time() - start_time
-            self.status_label.config(
-                text=f"분석 완료! {len(self.shot_data)}발 감지 (소요시간: {elapsed:.1f}초)"
-            )
+            elapsed = summary['elapsed']
+            self.updates.post('progress', summary['frames_decoded'], summary['total_frames'], None)
+            self.updates.send('status', f"분석 완료! {len(self.shot_data)}발 감지 (소요시간: {elapsed:.1f}초)")
 
             # 최종 요약
-            summary = f"\n{'=' * 50}\n"
-            summary += f"📊 분석 완료: 총 {len(self.shot_data)}발의 사격 감지\n"
-            summary += f"⏱️ 분석 시간: {elapsed:.1f}초\n"
-            summary += f"🎬 총 프레임: {total_frames} (FPS: {fps:.1f})\n"
-            summary += f"{'=' * 50}\n"
-            self.result_text.insert(tk.END, summary)
+            summary_text = f"\n{'=' * 50}\n"
+            summary_text += f"📊 분석 완료: 총 {len(self.shot_data)}발의 사격 감지\n"
+            summary_text += f"⏱️ 분석 시간: {elapsed:.1f}초\n"
+            summary_text += f"🎬 총 프레임: {summary['total_frames']} (FPS: {summary['video_fps']:.1f})\n"
+            summary_text += f"{'=' * 50}\n"
+            self.updates.send('log', summary_text)
 
         self.analysis_running = False
 
+    def on_ammo_read(self, total_ammo, current_ammo, frame_count):
+        """엔진 콜백: 탄약 판독 결과"""
+        # 실시간 탄약 정보 업데이트 (최신 값만 화면에 반영)
+        self.updates.post('ammo', total_ammo, current_ammo, frame_count)
+
+        # 프레임별 탄약 정보만 표시 (사격 비교가 불가능할 때)
+        previous_ammo = self.engine.detector.previous_ammo
+        if current_ammo is None or previous_ammo is None:
+            if current_ammo is not None or total_ammo is not None:
+                info = f"프레임 {frame_count:5d} | 총탄:{total_ammo if total_ammo else '?'} 현재:{current_ammo if current_ammo else '?'}\n"
+                # 너무 많은 로그를 방지하기 위해 10프레임마다만 표시
+                if frame_count % (self.engine.skip_frames * 10) == 0:
+                    self.updates.send('log', info)
+
+    def on_shot_detected(self, shot, shot_count):
+        """엔진 콜백: 사격 감지"""
+        self.updates.send('shot', shot, shot_count)
+
+    def on_analysis_progress(self, frame_count, total_frames, fps_actual):
+        """엔진 콜백: 진행 상황 (100프레임마다)"""
+        self.updates.post('progress', frame_count, total_frames, fps_actual)
+
+    def drain_updates(self):
+        """작업 스레드 업데이트를 GUI 스레드에서 적용 (UPDATE_INTERVAL_MS 간격)"""
+        lines = []
+        shot_count = None
+
+        for kind, args in self.updates.drain():
+            if kind == 'shot':
+                # 🎯 사격 감지 결과
+                shot, shot_count = args
+                lines.append(f"🎯 {shot_count:2d}. {shot['time']} | {shot['previous_ammo']}→{shot['current_ammo']} "
+                             f"({shot['shots_fired']}발)\n")
+            elif kind == 'log':
+                lines.append(args[0])
+            elif kind == 'ammo':
+                self.update_ammo_display(*args)
+            elif kind == 'progress':
+                frame_count, total_frames, fps_actual = args
+                self.progress_bar['maximum'] = total_frames
+                self.progress_bar['value'] = frame_count
+                if fps_actual is not None:
+                    self.status_label.config(text=f"분석 중... {frame_count}/{total_frames} ({fps_actual:.1f} FPS)")
+            elif kind == 'status':
+                self.status_label.config(text=args[0])
+
+        # 한 주기의 로그/사격: 텍스트 삽입 한 번, 알림음 한 번
+        if lines:
+            self.result_text.insert(tk.END, ''.join(lines))
+            self.result_text.see(tk.END)
+        if shot_count is not None:
+            self.update_shot_count(shot_count)
+            if self.sound_alert.get():
+                self.play_alert_sound()
+
+        self.root.after(UPDATE_INTERVAL_MS, self.drain_updates)
+
     def update_ammo_display(self, total_ammo, current_ammo, frame_count):
         """실시간 탄약 정보 표시 업데이트"""
         total_str = str(total_ammo) if total_ammo is not None else "?"
@@ -634,6 +595,7 @@ class VideoAmmoAnalyzer:
             messagebox.showwarning("경고", "현재 총알 수 영역을 설정해주세요.")
             return
 
+        self.engine = self.create_engine()
         self.analysis_running = True
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END, "🚀 분석 시작...\n\n")
@@ -644,6 +606,8 @@ class VideoAmmoAnalyzer:
 
     def stop_analysis(self):
         self.analysis_running = False
+        if self.engine:
+            self.engine.stop()
         self.status_label.config(text="상태: 분석 중지됨")
 
     def save_csv(self):
@@ -662,15 +626,7 @@ class VideoAmmoAnalyzer:
         )
 
         if file_path:
-            with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                fieldnames = ['shot_number', 'frame', 'time', 'time_seconds', 'total_ammo', 'current_ammo',
-                              'previous_ammo', 'shots_fired']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                writer.writeheader()
-                for i, row in enumerate(self.shot_data, 1):
-                    row['shot_number'] = i
-                    writer.writerow(row)
+            write_shots_csv(file_path, self.shot_data)
 
             messagebox.showinfo("성공", f"📁 {len(self.shot_data)}개 데이터가 저장되었습니다!\n{file_path}")
 
@@ -0,0 +1,4 @@
+"""ShotDORO analysis engine - OCR-based shot detection without the GUI"""
+
+from .engine import AnalysisEngine, ShotDetector, probe_video, write_shots_csv
+from .ocr import DigitReader
@@ -0,0 +1,194 @@
+"""Batch analysis: many videos with the same HUD regions, scheduled across one process pool"""
+
+import csv
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .engine import probe_video, write_shots_csv
+from .parallel import build_tasks, merge_segments, run_segment, split_segments, sum_stats
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.webm', '.flv', '.ts', '.m4v', '.wmv')
+
+INDEX_FIELDS = ['video', 'status', 'shots', 'frames', 'segments', 'elapsed', 'shots_csv', 'error']
+
+
+def collect_videos(source):
+    """Video paths of a directory (sorted, non-recursive) or of a manifest file
+
+    A manifest lists one video per line; blank lines and '#' comments are
+    ignored and relative paths are relative to the manifest's folder.
+    """
+    if os.path.isdir(source):
+        return [os.path.join(source, name) for name in sorted(os.listdir(source))
+                if name.lower().endswith(VIDEO_EXTENSIONS) and os.path.isfile(os.path.join(source, name))]
+
+    base = os.path.dirname(os.path.abspath(source))
+    videos = []
+    with open(source, encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                videos.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return videos
+
+
+def load_region_profile(path):
+    """(current_region, total_region) from a JSON profile {"current": [x1, y1, x2, y2], "total": [...]}"""
+    with open(path, encoding='utf-8') as f:
+        profile = json.load(f)
+    try:
+        current = tuple(int(v) for v in profile['current'])
+        total = tuple(int(v) for v in profile['total']) if profile.get('total') else None
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"region profile needs \"current\": [x1, y1, x2, y2] (and optionally \"total\"): {path}")
+    return current, total
+
+
+def plan_segments(frame_counts, workers):
+    """Segments per video so that no single job dominates the batch
+
+    The batch is cut into pieces of about total_frames / workers frames: short
+    videos stay whole jobs, a video longer than that share is split so its
+    pieces run side by side (and a lone video uses every worker). A video is
+    never cut into more pieces than it has frames.
+    """
+    total = sum(frame_counts)
+    if not total:
+        return [1] * len(frame_counts)
+    share = total / workers
+    return [max(1, min(workers, frames, math.ceil(frames / share))) if frames else 1 for frames in frame_counts]
+
+
+def shots_csv_path(video_path, output_dir, used):
+    """<output_dir or video folder>/<video name>_shots.csv, made unique within the batch"""
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    folder = output_dir or os.path.dirname(os.path.abspath(video_path))
+    path = os.path.join(folder, f"{stem}_shots.csv")
+    number = 2
+    while path in used:
+        path = os.path.join(folder, f"{stem}_{number}_shots.csv")
+        number += 1
+    used.add(path)
+    return path
+
+
+def write_index(path, jobs):
+    """Combined index of the batch: one row per video"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for job in jobs:
+            # Failed videos have no shot CSV
+            writer.writerow(dict(job, shots_csv='') if job['status'] == 'failed' else job)
+
+
+def run_batch(videos, current_ammo_region, total_ammo_region=None, workers=None, output_dir=None,
+              index_path=None, reader_options=None, on_job=None, **engine_options):
+    """Analyze every video, writing one shot CSV per video and a combined index
+
+    Whole videos and segments of long videos are scheduled longest-first on
+    one pool of `workers` processes (default: one per core). A video that
+    cannot be opened or whose analysis fails is recorded as failed in the
+    index; the rest of the batch continues. on_job(job, done, total) is
+    called when a video finishes. Returns (jobs, summary).
+    """
+    if engine_options.get('profile_path') or engine_options.get('checkpoint_path'):
+        raise ValueError("profiles and checkpoints are per engine run and not available in batch mode")
+    engine_options.pop('profile_path', None)
+
+    workers = workers or os.cpu_count() or 1
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    index_path = index_path or os.path.join(output_dir or os.getcwd(), 'batch_index.csv')
+
+    used = set()
+    jobs = []
+    for video_path in videos:
+        job = {'video': video_path, 'status': 'pending', 'shots': 0, 'frames': 0, 'segments': 0,
+               'elapsed': 0, 'shots_csv': shots_csv_path(video_path, output_dir, used), 'error': ''}
+        try:
+            job['frames'], job['fps'] = probe_video(video_path)
+        except (IOError, OSError) as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        jobs.append(job)
+
+    runnable = [job for job in jobs if job['status'] == 'pending']
+    for job, count in zip(runnable, plan_segments([job['frames'] for job in runnable], workers)):
+        job['segments'] = count
+    # Adaptive sampling follows one stride across the whole video, so those videos are not split
+    max_skip_frames = (engine_options or {}).get('max_skip_frames')
+    if max_skip_frames and max_skip_frames > (engine_options or {}).get('skip_frames', 1):
+        for job in runnable:
+            job['segments'] = 1
+
+    tasks = []
+    for job in runnable:
+        segments = split_segments(job['frames'], job['segments'])
+        # The job completes once every segment it was actually split into has reported
+        job['segments'] = len(segments)
+        for task in build_tasks(job['video'], current_ammo_region, total_ammo_region,
+                                segments, reader_options, engine_options):
+            tasks.append((task, job))
+    # Longest first: big pieces start early, short ones fill the gaps at the end
+    tasks.sort(key=lambda item: item[0]['end_frame'] - item[0]['start_frame'], reverse=True)
+
+    done = 0
+    for job in jobs:
+        if job['status'] == 'failed':
+            done += 1
+            if on_job:
+                on_job(job, done, len(jobs))
+
+    start_time = time.time()
+    results = {id(job): [] for job in runnable}
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(tasks) or 1))) as pool:
+        futures = {pool.submit(run_segment, task): job for task, job in tasks}
+
+        for future in as_completed(futures):
+            job = futures[future]
+            if job['status'] == 'failed':
+                continue
+            try:
+                results[id(job)].append(future.result())
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = f"{type(e).__name__}: {e}"
+            else:
+                if len(results[id(job)]) < job['segments']:
+                    continue
+                finish_job(job, results[id(job)])
+
+            # Failed jobs still have segments in flight; the remaining ones are dropped
+            results[id(job)] = []
+            done += 1
+            if on_job:
+                on_job(job, done, len(jobs))
+
+    write_index(index_path, jobs)
+    return jobs, {'videos': len(jobs), 'failed': sum(job['status'] == 'failed' for job in jobs),
+                  'shots': sum(job['shots'] for job in jobs), 'workers': workers,
+                  'elapsed': time.time() - start_time, 'index': index_path}
+
+
+def finish_job(job, results):
+    """Merge the segments of one video and write its shot CSV"""
+    shots = merge_segments(results)
+    try:
+        write_shots_csv(job['shots_csv'], shots)
+    except OSError as e:
+        job['status'] = 'failed'
+        job['error'] = str(e)
+        return
+
+    ocr = {}
+    for result in results:
+        sum_stats(ocr, result['summary']['ocr'])
+    job['status'] = 'done' if all(result['summary']['completed'] for result in results) else 'stopped'
+    job['shots'] = len(shots)
+    # Worker time spent on this video (its segments may have run side by side)
+    job['elapsed'] = round(sum(result['summary']['elapsed'] for result in results), 3)
+    job['ocr_calls'] = ocr.get('ocr_calls', 0)
@@ -0,0 +1,150 @@
+"""Benchmarks of the analysis hot paths"""
+
+import os
+import platform
+import tempfile
+import time
+
+import cv2
+
+from .engine import AnalysisEngine
+from .frames import CaptureSource
+from .synthetic import synthetic_video
+
+
+def decode_cost(video_path, skip_frames, max_frames=None, grab_skipped=True):
+    """Decode-only pass over a video as the analysis loop would do it
+
+    Returns a dict with the frames decoded/analyzed, wall time and the decode
+    cost per analyzed frame. With grab_skipped=False every frame is read()
+    (full BGR conversion), which is how the loop worked before grab() skipping.
+    """
+    source = CaptureSource(video_path)
+    frame_count = 0
+    analyzed = 0
+
+    start_time = time.perf_counter()
+    try:
+        while max_frames is None or frame_count < max_frames:
+            if grab_skipped and (frame_count + 1) % skip_frames != 0:
+                if not source.skip():
+                    break
+                frame_count += 1
+                continue
+
+            if source.read() is None:
+                break
+            frame_count += 1
+            if frame_count % skip_frames == 0:
+                analyzed += 1
+    finally:
+        source.release()
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'skip': skip_frames,
+        'mode': 'grab' if grab_skipped else 'read',
+        'frames_decoded': frame_count,
+        'frames_analyzed': analyzed,
+        'elapsed': elapsed,
+        'ms_per_analyzed_frame': 1000 * elapsed / analyzed if analyzed else 0,
+    }
+
+
+def decode_benchmark(video_path, skips=range(1, 11), max_frames=None):
+    """decode_cost() for every skip value, read-all vs grab-skipped"""
+    results = []
+    for skip in skips:
+        for grab_skipped in (False, True):
+            results.append(decode_cost(video_path, skip, max_frames, grab_skipped))
+    return results
+
+
+def score_shots(detected, truth, fps, tolerance=0.1):
+    """Precision/recall/timing error of detected shot frames against ground-truth frames
+
+    Both lists hold one 1-based frame number per round fired, in increasing
+    order (an event that fired 2 rounds appears twice). Each detected round is
+    matched to the earliest unmatched true round within `tolerance` seconds;
+    a detection lags the truth by up to the sampling stride.
+    """
+    window = tolerance * fps
+    matched = []
+    unmatched = []
+    t = 0
+    for frame in detected:
+        while t < len(truth) and truth[t] < frame - window:
+            t += 1
+        if t < len(truth) and abs(truth[t] - frame) <= window:
+            matched.append((frame - truth[t]) / fps)
+            t += 1
+        else:
+            unmatched.append(frame)
+
+    errors = [abs(error) for error in matched]
+    return {
+        'true_shots': len(truth),
+        'detected': len(detected),
+        'matched': len(matched),
+        'false_positives': len(unmatched),
+        'false_positive_frames': sorted(set(unmatched)),
+        'precision': len(matched) / len(detected) if detected else 1.0,
+        'recall': len(matched) / len(truth) if truth else 1.0,
+        'timing_error_ms': {
+            'mean': 1000 * sum(errors) / len(errors) if errors else 0,
+            'max': 1000 * max(errors) if errors else 0,
+            'mean_signed': 1000 * sum(matched) / len(matched) if matched else 0,
+        },
+    }
+
+
+def end_to_end(scenario=None, reader=None, tolerance=0.1, video_path=None, **engine_options):
+    """Render a synthetic HUD video, analyze it and score the shots against its ground truth
+
+    `scenario` holds synthetic_video() keyword arguments; the video is written
+    to `video_path` (kept) or a temporary file (removed afterwards).
+    `engine_options` are passed to AnalysisEngine. Returns a JSON-ready dict
+    with the scenario, throughput, OCR calls per analyzed frame and accuracy.
+    """
+    scenario = dict(scenario or {})
+    keep = video_path is not None
+    if not keep:
+        handle, video_path = tempfile.mkstemp(suffix='.avi', prefix='shotdoro-bench-')
+        os.close(handle)
+
+    try:
+        render_start = time.perf_counter()
+        truth = synthetic_video(video_path, **scenario)
+        render_time = time.perf_counter() - render_start
+
+        engine = AnalysisEngine(video_path, truth['current_region'], truth['total_region'],
+                                reader=reader, **engine_options)
+        shots = engine.run()
+    finally:
+        if not keep and os.path.exists(video_path):
+            os.remove(video_path)
+
+    summary = engine.summary
+    analyzed = summary['frames_analyzed']
+    ocr = summary['ocr']
+    truth_frames = [frame for frame, fired in truth.pop('shots') for _ in range(fired)]
+    detected = [shot['frame'] for shot in shots for _ in range(shot['shots_fired'])]
+    if not keep:
+        truth.pop('video')
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {'python': platform.python_version(), 'opencv': cv2.__version__, 'machine': platform.machine()},
+        'scenario': truth,
+        'engine': {name: value for name, value in engine_options.items() if value is not None},
+        'render_seconds': render_time,
+        'elapsed': summary['elapsed'],
+        'analysis_fps': summary['analysis_fps'],
+        'frames_decoded': summary['frames_decoded'],
+        'frames_analyzed': analyzed,
+        'ocr_calls': ocr.get('ocr_calls', 0),
+        'ocr_calls_per_frame': ocr.get('ocr_calls', 0) / analyzed if analyzed else 0,
+        'ocr': ocr,
+        'profile': summary.get('profile'),
+        'accuracy': score_shots(detected, truth_frames, summary['video_fps'], tolerance),
+    }
@@ -0,0 +1,89 @@
+"""Checkpoint sidecars: periodic engine state so a long analysis can resume after a stop or crash"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CHECKPOINT_VERSION = 1
+
+# Bytes hashed from the start and the end of the video for its fingerprint
+FINGERPRINT_BYTES = 1 << 20
+
+
+def checkpoint_path(video_path):
+    """Default checkpoint location: next to the video"""
+    return video_path + '.shotdoro.ckpt.json'
+
+
+def video_fingerprint(video_path):
+    """Size plus a hash of the first and last megabyte (cheap even for multi-GB VODs)"""
+    size = os.path.getsize(video_path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(video_path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, size - FINGERPRINT_BYTES))
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return f"{size}:{digest.hexdigest()}"
+
+
+def write_checkpoint(path, state):
+    """Atomically replace the checkpoint: write a temp file in the same directory, fsync, rename"""
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix='.shotdoro-ckpt-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_checkpoint(path):
+    """Saved state, or None when there is no (readable) checkpoint"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != CHECKPOINT_VERSION:
+        return None
+    return state
+
+
+def check_resumable(state, fingerprint, params):
+    """Raise ValueError if a checkpoint belongs to another video or other analysis settings"""
+    if state['fingerprint'] != fingerprint:
+        raise ValueError(f"checkpoint was made for a different video ({state['video']})")
+    changed = sorted(key for key in set(state['params']) | set(params)
+                     if state['params'].get(key) != params.get(key))
+    if changed:
+        raise ValueError(f"checkpoint was made with different settings: {', '.join(changed)}")
+
+
+class Checkpointer:
+    """Rate limiter for checkpoint writes: due() at most once every `interval` seconds"""
+
+    def __init__(self, path, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self.last = time.monotonic()
+        self.writes = 0
+
+    def due(self):
+        return time.monotonic() - self.last >= self.interval
+
+    def save(self, state):
+        write_checkpoint(self.path, state)
+        self.last = time.monotonic()
+        self.writes += 1
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
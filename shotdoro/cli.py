@@ -0,0 +1,539 @@
+"""Command line entry point: python -m shotdoro analyze VIDEO --current x1,y1,x2,y2"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+
+import pytesseract
+
+from .batch import collect_videos, load_region_profile, run_batch
+from .bench import decode_benchmark, end_to_end
+from .checkpoint import checkpoint_path
+from .engine import AnalysisEngine, write_shots_csv
+from .ocr import DigitReader, estimated_calls_saved, prediction_hit_rate
+from .ocr_cache import default_cache_path
+from .parallel import analyze_parallel
+from .synthetic import FONTS
+from .telemetry import CHUNK_ROWS, add_shot_column_streaming
+
+
+def parse_region(text):
+    """Parse 'x1,y1,x2,y2' into a region tuple"""
+    try:
+        x1, y1, x2, y2 = (int(v) for v in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"region must be x1,y1,x2,y2 (got '{text}')")
+    if x2 <= x1 or y2 <= y1:
+        raise argparse.ArgumentTypeError(f"region is empty: '{text}'")
+    return (x1, y1, x2, y2)
+
+
+def parse_size(text):
+    """Parse 'WIDTHxHEIGHT' into a (width, height) tuple"""
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must be WIDTHxHEIGHT (got '{text}')")
+    return (width, height)
+
+
+def add_analysis_arguments(parser, regions=True):
+    """Region / sampling options shared by the analysis commands"""
+    if regions:
+        parser.add_argument('--current', type=parse_region, required=True, metavar='X1,Y1,X2,Y2',
+                            help='current ammo region')
+        parser.add_argument('--total', type=parse_region, metavar='X1,Y1,X2,Y2',
+                            help='total ammo region')
+    parser.add_argument('--skip', type=int, default=1, help='analyze every N-th frame (default: 1)')
+    parser.add_argument('--max-skip', type=int, metavar='N',
+                        help='adaptive sampling: widen the stride from --skip up to N frames while the '
+                             'ammo count is stable, back to --skip after every change (not with -j, --batch or --ocr-threads)')
+    parser.add_argument('--gate', type=float, metavar='LEVELS',
+                        help='reuse the previous reading while no ROI cell changed more than LEVELS '
+                             'gray levels (e.g. 10; default: OCR every frame)')
+    parser.add_argument('--cache', action='store_true',
+                        help='memoize OCR results by crop content (persisted in the user cache dir)')
+    parser.add_argument('--cache-db', metavar='PATH', help='SQLite file for the OCR cache (implies --cache)')
+    parser.add_argument('--cache-size', type=int, default=4096, help='in-memory OCR cache entries (default: 4096)')
+    parser.add_argument('--cache-memory-only', action='store_true', help='do not persist the OCR cache')
+    parser.add_argument('--ocr-backend', choices=['pytesseract', 'capi'], default='pytesseract',
+                        help="'capi' keeps Tesseract engines loaded in-process via libtesseract "
+                             "(default: pytesseract, one subprocess per call)")
+    parser.add_argument('--adaptive', choices=['reorder', 'pin'],
+                        help='reorder the threshold/psm cascade by hit rate; pin freezes the order after warm-up')
+    parser.add_argument('--warmup', type=int, default=200,
+                        help='recognitions before the adaptive order is pinned (default: 200)')
+    parser.add_argument('--search', type=float, metavar='SECONDS',
+                        help='OCR one frame every SECONDS and bisect to the exact frame wherever the ammo '
+                             'count changed (e.g. 0.5; --skip is ignored)')
+    parser.add_argument('--ocr-threads', type=int, default=1, metavar='N',
+                        help='pipeline the scan: one decoder thread, N OCR threads and an in-order '
+                             'reducer (default: 1, sequential; not with --max-skip)')
+    parser.add_argument('--queue-size', type=int, metavar='FRAMES',
+                        help='capacity of the pipeline queues (default: 4 x --ocr-threads)')
+    parser.add_argument('--batch', type=int, default=1, metavar='K',
+                        help='OCR the crops of K analyzed frames in one mosaic Tesseract call (default: 1)')
+    parser.add_argument('--eager-total', action='store_true',
+                        help='OCR the total ammo region on every analyzed frame (default: only on the first '
+                             'reading, shots, reloads and when its pixels change)')
+    parser.add_argument('--frame-source', choices=['opencv', 'ffmpeg'], default='opencv',
+                        help="'ffmpeg' decodes only the grayscale crop around the ammo regions "
+                             "through an ffmpeg pipe (default: opencv)")
+    parser.add_argument('--ffmpeg', default='ffmpeg', metavar='PATH', help='ffmpeg executable (default: ffmpeg)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='time every stage (decode, preprocessing, each Tesseract call, detection) '
+                             'and write count/total/p50/p95/p99 per stage as JSON')
+    parser.add_argument('--glyphs', action='store_true',
+                        help='learn digit templates from Tesseract readings and classify by template matching')
+    parser.add_argument('--glyph-bootstrap', type=int, default=100,
+                        help='Tesseract readings used to build the templates (default: 100)')
+    parser.add_argument('--predict', action='store_true',
+                        help='check the previous value, one less and reload values against crops of earlier '
+                             'readings before running OCR')
+    parser.add_argument('--predict-confidence', type=float, default=0.97, metavar='SCORE',
+                        help='correlation a predicted value needs to skip OCR (default: 0.97)')
+
+
+def reader_options(args):
+    """DigitReader keyword arguments from command line options"""
+    cache_path = None
+    if args.cache or args.cache_db:
+        cache_path = None if args.cache_memory_only else (args.cache_db or default_cache_path())
+
+    return {
+        'gate_threshold': args.gate,
+        'cache_size': args.cache_size if (args.cache or args.cache_db) else None,
+        'cache_path': cache_path,
+        'glyphs': args.glyphs,
+        'glyph_bootstrap': args.glyph_bootstrap,
+        'predict': args.predict,
+        'predict_confidence': args.predict_confidence,
+        'backend': args.ocr_backend,
+        'adaptive': args.adaptive,
+        'warmup': args.warmup,
+    }
+
+
+def engine_options(args):
+    """AnalysisEngine keyword arguments (besides the regions and reader) from command line options"""
+    return {
+        'skip_frames': args.skip,
+        'batch_frames': args.batch,
+        'frame_source': args.frame_source,
+        'ffmpeg_cmd': args.ffmpeg,
+        'search_interval': args.search,
+        'max_skip_frames': args.max_skip,
+        'ocr_threads': args.ocr_threads,
+        'queue_size': args.queue_size,
+        'profile_path': args.profile,
+        'lazy_total': not args.eager_total,
+    }
+
+
+def build_reader(args):
+    """DigitReader configured from command line options"""
+    return DigitReader(**reader_options(args))
+
+
+def print_shot(shot, count):
+    print(f"🎯 {count:2d}. {shot['time']} | {shot['previous_ammo']}→{shot['current_ammo']} "
+          f"({shot['shots_fired']} shots)")
+
+
+def print_progress(frame_count, total_frames, fps_actual):
+    print(f"Analyzing... {frame_count}/{total_frames} ({fps_actual:.1f} FPS)", file=sys.stderr)
+
+
+def print_ocr_summary(stats):
+    print(f"🔍 OCR: {stats.get('reads', 0)} reads, {stats.get('ocr_calls', 0)} Tesseract calls")
+    if stats.get('cache_hits'):
+        print(f"💾 OCR cache: {stats['cache_hits']} hits, {stats.get('recognitions', 0)} misses")
+    if stats.get('predict_hits') or stats.get('predict_misses'):
+        print(f"🔮 Prediction: {stats.get('predict_hits', 0)} hits, {stats.get('predict_misses', 0)} misses "
+              f"({prediction_hit_rate(stats):.0%} hit rate)")
+    if stats.get('glyph_hits') or stats.get('glyph_fallbacks'):
+        print(f"🔤 Glyph templates: {stats.get('glyph_hits', 0)} hits, "
+              f"{stats.get('glyph_fallbacks', 0)} low-confidence fallbacks to Tesseract")
+    if stats.get('batch_calls'):
+        print(f"🧩 Batch OCR: {stats['batched_crops']} crops in {stats['batch_calls']} mosaic calls, "
+              f"{stats.get('batch_fallbacks', 0)} retried individually")
+    if stats.get('total_skips'):
+        print(f"🎒 Total ammo: read on {stats.get('total_reads', 0)} frames, "
+              f"reused on {stats['total_skips']}")
+    if stats.get('gate_skips'):
+        print(f"🚦 ROI gate: {stats['gate_skips']} reads skipped "
+              f"(~{estimated_calls_saved(stats)} OCR calls saved)")
+
+
+def print_pipeline(report):
+    utilization = report['utilization']
+    print(f"🧵 Pipeline: decode {utilization['decode']:.0%} | OCR {utilization['ocr']:.0%} "
+          f"x{report['ocr_threads']} | reduce {utilization['reduce']:.0%} busy")
+    for name, depth in report['queue_depth'].items():
+        print(f"   {name} queue: avg {depth['average']:.1f}, peak {depth['peak']}/{depth['capacity']}")
+
+
+def print_profile(report):
+    print(f"⏱️ Stage profile ({report['bound'] or '-'}-bound):")
+    print("   stage             count   total s   p50 ms   p95 ms   p99 ms")
+    for stage, stats in sorted(report['stages'].items(), key=lambda item: -item[1]['total_s']):
+        print(f"   {stage:<15} {stats['count']:7d} {stats['total_s']:9.2f} {stats['p50_ms']:8.2f} "
+              f"{stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f}")
+
+
+def print_combo_hits(stats, order=None):
+    combos = stats.get('combos', {})
+    names = order or sorted(combos, key=lambda name: -combos[name]['hits'])
+    print("🧮 Cascade hits (threshold/psm: hits/attempts):")
+    for name in names:
+        counts = combos.get(name)
+        if counts and counts['attempts']:
+            print(f"   {name:<16} {counts['hits']}/{counts['attempts']}")
+
+
+def print_segment(done, total, result):
+    print(f"Segment {done}/{total} done: frames {result['start_frame']}-{result['end_frame']} "
+          f"({len(result['shots'])} shots)", file=sys.stderr)
+
+
+def checkpoint_options(args, video_path):
+    """Checkpoint keyword arguments of AnalysisEngine"""
+    if args.checkpoint is None and not args.resume:
+        return {}
+    return {
+        'checkpoint_path': args.checkpoint or checkpoint_path(video_path),
+        'checkpoint_interval': args.checkpoint_interval,
+        'resume': args.resume,
+    }
+
+
+def cmd_analyze(args):
+    if args.workers > 1:
+        if args.checkpoint is not None or args.resume:
+            raise ValueError("--checkpoint/--resume work on a single engine run, not with -j")
+        shots, summary = analyze_parallel(
+            args.video, args.current, args.total,
+            workers=args.workers,
+            segments=args.segments,
+            reader_options=reader_options(args),
+            on_segment=None if args.quiet else print_segment,
+            **engine_options(args),
+        )
+        if not args.quiet:
+            for i, shot in enumerate(shots, 1):
+                print_shot(shot, i)
+    else:
+        engine = AnalysisEngine(
+            args.video, args.current, args.total,
+            reader=build_reader(args),
+            on_shot=None if args.quiet else print_shot,
+            on_progress=None if args.quiet else print_progress,
+            **engine_options(args),
+            **checkpoint_options(args, args.video),
+        )
+        shots = engine.run()
+        summary = engine.summary
+        if summary.get('resumed_from'):
+            print(f"💾 Resumed from frame {summary['resumed_from']}")
+
+    output = args.output or os.path.splitext(args.video)[0] + '_shots.csv'
+    write_shots_csv(output, shots)
+
+    print(f"📊 Analysis complete: {len(shots)} shots detected")
+    print(f"⏱️ Analysis time: {summary['elapsed']:.1f}s ({summary['analysis_fps']:.1f} FPS)")
+    if args.max_skip:
+        print(f"📏 Average stride: {summary['average_stride']:.2f} frames")
+    print_ocr_summary(summary['ocr'])
+    if summary.get('pipeline'):
+        print_pipeline(summary['pipeline'])
+    if summary.get('profile'):
+        print_profile(summary['profile'])
+    if not args.quiet:
+        print_combo_hits(summary['ocr'], summary.get('combo_order'))
+    print(f"💾 Saved to: {output}")
+
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    return 0
+
+
+def cmd_bench_decode(args):
+    results = decode_benchmark(args.video, range(1, args.max_skip + 1), args.frames)
+
+    print("skip  read ms/frame  grab ms/frame  speedup")
+    by_skip = {}
+    for result in results:
+        by_skip.setdefault(result['skip'], {})[result['mode']] = result
+    for skip, modes in by_skip.items():
+        read_ms = modes['read']['ms_per_analyzed_frame']
+        grab_ms = modes['grab']['ms_per_analyzed_frame']
+        speedup = read_ms / grab_ms if grab_ms else 0
+        print(f"{skip:4d}  {read_ms:13.2f}  {grab_ms:13.2f}  {speedup:6.2f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+def cmd_bench(args):
+    scenario = {
+        'seconds': args.seconds,
+        'size': args.size,
+        'fps': args.fps,
+        'font': args.font,
+        'noise': args.noise,
+        'quality': args.quality,
+        'codec': args.codec,
+        'magazine': args.magazine,
+        'fire_rate': args.fire_rate,
+        'reload_time': args.reload_time,
+        'seed': args.seed,
+    }
+    result = end_to_end(scenario, reader=build_reader(args), tolerance=args.tolerance,
+                        video_path=args.keep_video, **engine_options(args))
+
+    accuracy = result['accuracy']
+    timing = accuracy['timing_error_ms']
+    print(f"🎬 {result['scenario']['frames']} frames {args.size[0]}x{args.size[1]} @ {args.fps} FPS, "
+          f"{accuracy['true_shots']} shots (rendered in {result['render_seconds']:.1f}s)")
+    print(f"⏱️ Analysis: {result['elapsed']:.1f}s ({result['analysis_fps']:.1f} FPS), "
+          f"{result['ocr_calls_per_frame']:.2f} OCR calls per analyzed frame")
+    print(f"🎯 Precision {accuracy['precision']:.3f} | recall {accuracy['recall']:.3f} | "
+          f"timing error mean {timing['mean']:.1f} ms, max {timing['max']:.1f} ms")
+    if result.get('profile'):
+        print_profile(result['profile'])
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    return 0
+
+
+def print_live(live):
+    latency = live['latency']
+    shot_latency = live['shot_latency']
+    print(f"📡 Live ({live['input']}): {live['frames_received']} frames received, "
+          f"{live['dropped_stale'] + live['dropped_overflow']} dropped to stay within {live['latency_budget']}s")
+    print(f"   processing latency p50 {latency['p50_ms']:.0f} ms, p95 {latency['p95_ms']:.0f} ms, "
+          f"max {latency['max_ms']:.0f} ms; shots p95 {shot_latency['p95_ms']:.0f} ms; "
+          f"behind stream p95 {live['behind_stream']['p95_ms']:.0f} ms")
+
+
+def cmd_live(args):
+    options = engine_options(args)
+    options.update(frame_source='live', latency_budget=args.latency, realtime=args.realtime)
+    engine = AnalysisEngine(
+        args.input, args.current, args.total,
+        reader=build_reader(args),
+        on_shot=None if args.quiet else print_shot,
+        **options,
+    )
+
+    errors = []
+
+    def run():
+        try:
+            engine.run()
+        except Exception as e:
+            errors.append(e)
+
+    # Ctrl+C ends the session; the shots so far are still saved
+    thread = threading.Thread(target=run, name='shotdoro-live', daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        engine.stop()
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    summary = engine.summary
+    output = args.output or 'live_shots.csv'
+    write_shots_csv(output, engine.shots)
+
+    print(f"📊 Live session: {len(engine.shots)} shots detected in {summary['elapsed']:.1f}s")
+    print_live(summary['live'])
+    print(f"💾 Saved to: {output}")
+
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+def print_job(job, done, total):
+    if job['status'] == 'failed':
+        print(f"[{done}/{total}] ❌ {job['video']}: {job['error']}", file=sys.stderr)
+    else:
+        print(f"[{done}/{total}] {'✅' if job['status'] == 'done' else '⏹️'} {job['video']}: "
+              f"{job['shots']} shots ({job['segments']} segment(s), {job['elapsed']:.1f}s)")
+
+
+def cmd_batch(args):
+    if args.regions:
+        current, total = load_region_profile(args.regions)
+    elif args.current:
+        current, total = args.current, args.total
+    else:
+        raise ValueError("batch needs --regions FILE or --current X1,Y1,X2,Y2")
+
+    videos = collect_videos(args.source)
+    if not videos:
+        raise ValueError(f"no videos found in {args.source}")
+
+    jobs, summary = run_batch(
+        videos, current, total,
+        workers=args.workers,
+        output_dir=args.output_dir,
+        index_path=args.index,
+        reader_options=reader_options(args),
+        on_job=None if args.quiet else print_job,
+        **engine_options(args),
+    )
+
+    print(f"📚 Batch complete: {summary['videos']} videos, {summary['shots']} shots, "
+          f"{summary['failed']} failed ({summary['elapsed']:.1f}s on {summary['workers']} workers)")
+    print(f"💾 Index: {summary['index']}")
+    return 1 if summary['failed'] else 0
+
+
+def read_shot_times(path):
+    """time_seconds of every shot in a shot CSV written by 'analyze'"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [float(row['time_seconds']) for row in csv.DictReader(f)]
+
+
+def cmd_add_shots(args):
+    shot_times = read_shot_times(args.shots)
+    output = args.output or os.path.splitext(args.log)[0] + '_with_shots.csv'
+
+    def on_chunk(rows):
+        print(f"Adding shot times... {rows} rows written", file=sys.stderr)
+
+    result = add_shot_column_streaming(args.log, output, shot_times, args.tolerance,
+                                       time_column=args.time_column, chunk_rows=args.chunk_rows,
+                                       on_chunk=None if args.quiet else on_chunk)
+
+    print(f"📊 {len(shot_times)} shots, {result['matched']} rows matched "
+          f"(time column '{result['time_column']}', ±{args.tolerance}s, {result['rows']} rows)")
+    print(f"💾 Saved to: {output}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='shotdoro', description='ShotDORO headless video analyzer')
+    parser.add_argument('--tesseract-cmd', help='path to the tesseract executable')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    analyze = subparsers.add_parser('analyze', help='detect shots in a video file')
+    analyze.add_argument('video', help='video file to analyze')
+    add_analysis_arguments(analyze)
+    analyze.add_argument('-j', '--workers', type=int, default=1,
+                         help='split the video into segments analyzed by N processes (default: 1)')
+    analyze.add_argument('--segments', type=int,
+                         help='number of time segments in parallel mode (default: one per worker)')
+    analyze.add_argument('--checkpoint', nargs='?', const='', metavar='PATH',
+                         help='save the analysis state every --checkpoint-interval seconds '
+                              '(default PATH: <video>.shotdoro.ckpt.json); removed when the run completes')
+    analyze.add_argument('--checkpoint-interval', type=float, default=5.0, metavar='SECONDS',
+                         help='seconds between checkpoint writes (default: 5)')
+    analyze.add_argument('--resume', action='store_true',
+                         help='continue from the checkpoint if there is one (implies --checkpoint)')
+    analyze.add_argument('-o', '--output', help='shot CSV path (default: <video>_shots.csv)')
+    analyze.add_argument('--summary-json', help='write the run summary as JSON')
+    analyze.add_argument('-q', '--quiet', action='store_true', help='only print the final summary')
+    analyze.set_defaults(func=cmd_analyze)
+
+    live = subparsers.add_parser('live', help='detect shots in a growing file, named pipe or stream URL while it plays')
+    live.add_argument('input', help='video file being recorded, named pipe or stream URL (rtsp://, udp://, ...)')
+    add_analysis_arguments(live)
+    live.add_argument('--latency', type=float, default=0.5, metavar='SECONDS',
+                      help='latency budget: frames older than this are dropped when OCR falls behind (default: 0.5)')
+    live.add_argument('--realtime', action='store_true',
+                      help='read the input at its native frame rate (replay a finished file as if live)')
+    live.add_argument('-o', '--output', help='shot CSV path (default: live_shots.csv)')
+    live.add_argument('--summary-json', help='write the session summary (including latencies) as JSON')
+    live.add_argument('-q', '--quiet', action='store_true', help='only print the final summary')
+    live.set_defaults(func=cmd_live)
+
+    batch = subparsers.add_parser('batch', help='analyze a folder or manifest of videos sharing the same HUD regions')
+    batch.add_argument('source', help='folder of videos or a manifest file (one video path per line)')
+    batch.add_argument('--regions', metavar='FILE',
+                       help='region profile JSON: {"current": [x1, y1, x2, y2], "total": [x1, y1, x2, y2]}')
+    batch.add_argument('--current', type=parse_region, metavar='X1,Y1,X2,Y2',
+                       help='current ammo region (instead of --regions)')
+    batch.add_argument('--total', type=parse_region, metavar='X1,Y1,X2,Y2', help='total ammo region')
+    add_analysis_arguments(batch, regions=False)
+    batch.add_argument('-j', '--workers', type=int,
+                       help='worker processes shared by all videos (default: one per CPU core)')
+    batch.add_argument('--output-dir', help='folder for the shot CSVs and the index (default: next to each video)')
+    batch.add_argument('--index', help='combined index CSV (default: <output dir or cwd>/batch_index.csv)')
+    batch.add_argument('-q', '--quiet', action='store_true', help='only print the final summary')
+    batch.set_defaults(func=cmd_batch)
+
+    add_shots = subparsers.add_parser('add-shots',
+                                      help='mark telemetry CSV rows near shot times (streams large files)')
+    add_shots.add_argument('log', help='telemetry CSV')
+    add_shots.add_argument('shots', help="shot CSV written by 'analyze'")
+    add_shots.add_argument('--tolerance', type=float, default=0.1, help='match window in seconds (default: 0.1)')
+    add_shots.add_argument('--time-column', help='time column (default: detected)')
+    add_shots.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                           help=f'rows read per chunk (default: {CHUNK_ROWS})')
+    add_shots.add_argument('-o', '--output', help='output CSV (default: <log>_with_shots.csv)')
+    add_shots.add_argument('-q', '--quiet', action='store_true', help='only print the final summary')
+    add_shots.set_defaults(func=cmd_add_shots)
+
+    bench_decode = subparsers.add_parser('bench-decode',
+                                         help='decode cost per analyzed frame for skip=1..N, read() vs grab()')
+    bench_decode.add_argument('video', help='video file to decode')
+    bench_decode.add_argument('--max-skip', type=int, default=10, help='largest skip value (default: 10)')
+    bench_decode.add_argument('--frames', type=int, help='decode at most this many frames per run')
+    bench_decode.add_argument('--json', help='write the raw results as JSON')
+    bench_decode.set_defaults(func=cmd_bench_decode)
+
+    bench = subparsers.add_parser('bench',
+                                  help='analyze a synthetic HUD video and score the shots against its ground truth')
+    add_analysis_arguments(bench, regions=False)
+    bench.add_argument('--seconds', type=float, default=30, help='video length (default: 30)')
+    bench.add_argument('--size', type=parse_size, default=(1280, 720), metavar='WxH',
+                       help='resolution (default: 1280x720)')
+    bench.add_argument('--fps', type=int, default=30, help='frame rate (default: 30)')
+    bench.add_argument('--font', choices=sorted(FONTS), default='simplex', help='HUD font (default: simplex)')
+    bench.add_argument('--noise', type=int, default=6, help='per-frame noise amplitude in gray levels (default: 6)')
+    bench.add_argument('--quality', type=int, default=90, help='encoder quality 0-100 (default: 90)')
+    bench.add_argument('--codec', default='MJPG', help='FourCC of the encoder (default: MJPG)')
+    bench.add_argument('--magazine', type=int, default=30, help='magazine size (default: 30)')
+    bench.add_argument('--fire-rate', type=float, default=10, help='rounds per second in a burst (default: 10)')
+    bench.add_argument('--reload-time', type=float, default=2.0, help='reload duration in seconds (default: 2)')
+    bench.add_argument('--seed', type=int, default=0, help='random seed of the firing script and noise')
+    bench.add_argument('--tolerance', type=float, default=0.1,
+                       help='max seconds between a detected and a true shot (default: 0.1)')
+    bench.add_argument('--keep-video', metavar='PATH', help='write the synthetic video here and keep it')
+    bench.add_argument('--json', help='write the result (scenario, throughput, accuracy) as JSON')
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+
+    try:
+        return args.func(args)
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
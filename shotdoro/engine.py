@@ -0,0 +1,647 @@
+import csv
+import queue
+import time
+
+import cv2
+
+from .checkpoint import CHECKPOINT_VERSION, Checkpointer, check_resumable, read_checkpoint, video_fingerprint
+from .frames import open_source
+from .ocr import DigitReader, RoiChangeGate
+from .ocr_batch import MosaicBatcher
+from .pipeline import Pipeline
+from .search import AdaptiveStride, ChangeSearch, RandomAccess
+from .timing import NULL_PROFILER, Profiler, StageStats, TimedSource, write_profile
+
+
+# Column order used when shot events are written to CSV
+SHOT_FIELDS = ['shot_number', 'frame', 'time', 'time_seconds', 'total_ammo', 'current_ammo',
+               'previous_ammo', 'shots_fired']
+
+
+def probe_video(video_path):
+    """Return (total_frames, fps) of a video file"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video: {video_path}")
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        return total_frames, fps
+    finally:
+        cap.release()
+
+
+def format_shot_time(time_seconds):
+    """Format seconds as MM:SS.mmm"""
+    return f"{int(time_seconds // 60):02d}:{time_seconds % 60:06.3f}"
+
+
+def make_shot(frame_count, fps, current_ammo, previous_ammo, total_ammo):
+    """Build a shot event record"""
+    time_seconds = frame_count / fps
+    return {
+        'frame': frame_count,
+        'time': format_shot_time(time_seconds),
+        'time_seconds': round(time_seconds, 3),
+        'total_ammo': total_ammo if total_ammo else '-',
+        'current_ammo': current_ammo,
+        'previous_ammo': previous_ammo,
+        'shots_fired': previous_ammo - current_ammo
+    }
+
+
+def write_shots_csv(path, shots):
+    """Write shot events to a CSV file"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=SHOT_FIELDS)
+
+        writer.writeheader()
+        for i, shot in enumerate(shots, 1):
+            row = dict(shot)
+            row['shot_number'] = i
+            writer.writerow(row)
+
+
+class ShotDetector:
+    """Applies the current_ammo < previous_ammo rule to a stream of readings"""
+
+    def __init__(self, fps, previous_ammo=None):
+        self.fps = fps
+        self.previous_ammo = previous_ammo
+        self.shots = []
+
+        # First/last successful readings (frame, current, total)
+        self.first_reading = None
+        self.last_reading = None
+
+    def update(self, frame_count, current_ammo, total_ammo):
+        """Feed one reading, returns the shot event if one was detected"""
+        shot = None
+
+        if current_ammo is not None and self.previous_ammo is not None:
+            if current_ammo < self.previous_ammo:
+                shot = make_shot(frame_count, self.fps, current_ammo, self.previous_ammo, total_ammo)
+                self.shots.append(shot)
+
+        if current_ammo is not None:
+            reading = (frame_count, current_ammo, total_ammo)
+            if self.first_reading is None:
+                self.first_reading = reading
+            self.last_reading = reading
+            self.previous_ammo = current_ammo
+
+        return shot
+
+
+class LazyTotal:
+    """Total ammo, OCR'd only on frames where its value is recorded or may have changed
+
+    The total is stored with every shot and with the first reading of a run
+    (segment merging builds the shot across a cut from it), and on a HUD it only
+    changes on reloads. So it is read when the current reading is the first one
+    or differs from the previous one (shot or reload) and when the region's
+    pixels moved since the last read (downsampled cell compare, as the reader's
+    change gate); every other frame reuses the last value. The recorded totals
+    are the ones an every-frame read gives.
+    """
+
+    def __init__(self, reader, lazy=True, threshold=10, cell=4):
+        self.reader = reader
+        self.lazy = lazy
+        self.watch = RoiChangeGate(threshold, cell)
+        self.value = None
+        self.reads = 0
+        self.skips = 0
+
+    def due(self, roi, current_ammo, previous_ammo):
+        """Whether the total crop of this frame has to be OCR'd (counted as a read if so)"""
+        if roi is None:
+            return False
+        if self.lazy:
+            unchanged, _, signature = self.watch.lookup('total', roi)
+            if unchanged and (current_ammo is None or current_ammo == previous_ammo):
+                self.skips += 1
+                return False
+            self.watch.store('total', signature, None)
+        self.reads += 1
+        return True
+
+    def read(self, frame, region, current_ammo, previous_ammo):
+        """Total ammo of a frame given its current reading and the previous one"""
+        if self.due(self.reader.crop(frame, region), current_ammo, previous_ammo):
+            self.value = self.reader.read(frame, region)
+        return self.value
+
+    def snapshot(self, frame, region):
+        """(crop copy, its region) to pass to read() once the current reading is known"""
+        roi = self.reader.crop(frame, region)
+        if roi is None:
+            return None, None
+        return roi.copy(), (0, 0, roi.shape[1], roi.shape[0])
+
+    def stats(self):
+        return {'total_reads': self.reads, 'total_skips': self.skips}
+
+
+class AnalysisEngine:
+    """Headless shot detection: video path + regions + params in, shot events out
+
+    Callbacks are optional and invoked from the thread calling run():
+      on_ammo(total_ammo, current_ammo, frame_count) - every analyzed frame
+      on_shot(shot, shot_count)                      - every detected shot
+      on_progress(frame_count, total_frames, fps)    - every progress_interval frames
+    """
+
+    def __init__(self, video_path, current_ammo_region, total_ammo_region=None, skip_frames=1,
+                 reader=None, on_ammo=None, on_shot=None, on_progress=None, progress_interval=100,
+                 batch_frames=1, frame_source='opencv', ffmpeg_cmd='ffmpeg', search_interval=None,
+                 max_skip_frames=None, ocr_threads=1, queue_size=None, profile=False, profile_path=None,
+                 checkpoint_path=None, checkpoint_interval=5.0, resume=False, latency_budget=0.5, realtime=False,
+                 lazy_total=True):
+        self.video_path = video_path
+        self.current_ammo_region = current_ammo_region
+        self.total_ammo_region = total_ammo_region
+        self.skip_frames = max(1, int(skip_frames))
+
+        # Adaptive sampling: the stride grows from skip_frames up to max_skip_frames
+        # while the counter is stable and drops back after every change
+        self.max_skip_frames = max_skip_frames
+        self.stride = None
+
+        self.reader = reader or DigitReader()
+
+        # Total ammo is only OCR'd on first readings, shots, reloads and region changes
+        # (see LazyTotal); lazy_total=False reads it on every emitted frame
+        self.lazy_total = lazy_total
+        self.totals = None
+
+        # 'opencv' decodes full BGR frames, 'ffmpeg' only the gray crop around both regions
+        self.frame_source = frame_source
+        self.ffmpeg_cmd = ffmpeg_cmd
+        self.regions = (current_ammo_region, total_ammo_region)
+
+        # Batch mode: OCR the crops of `batch_frames` analyzed frames in one mosaic call
+        self.batch_frames = max(1, int(batch_frames))
+        self.batcher = MosaicBatcher(self.reader) if self.batch_frames > 1 else None
+        self.batch = []
+
+        # Change search: OCR one frame every `search_interval` seconds and bisect
+        # between samples that differ, instead of scanning every skip_frames-th frame
+        self.search_interval = search_interval
+
+        # Pipelined scan: decoder thread -> `ocr_threads` OCR workers -> in-order reducer
+        # (mosaic batching is a sequential-scan feature and is not used by the pipeline)
+        self.ocr_threads = max(1, int(ocr_threads))
+        self.queue_size = queue_size
+        self.pipeline = None
+
+        # Stage timing (decode, preprocessing, each Tesseract call, detection);
+        # the report goes to summary['profile'] and, with profile_path, to a JSON file
+        self.profile = profile or bool(profile_path)
+        self.profile_path = profile_path
+        self.profiler = NULL_PROFILER
+
+        # Checkpoints: the state after the last emitted frame is saved to checkpoint_path
+        # every checkpoint_interval seconds (and on stop/error); resume=True continues
+        # from it. The file is removed once the analysis completes.
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.checkpointer = None
+        self.resumed = None
+        self.fingerprint = None
+        self.params = None
+        self.last_emitted = None
+
+        # Live input (frame_source='live'): video_path is a growing file, named pipe or
+        # stream URL; frames older than latency_budget seconds are dropped when OCR falls
+        # behind. realtime paces a finished file at its native rate (testing stand-in).
+        self.latency_budget = latency_budget
+        self.realtime = realtime
+
+        self.on_ammo = on_ammo
+        self.on_shot = on_shot
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+
+        self.running = False
+        self.start_time = None
+        self.detector = None
+        self.summary = {}
+
+    @property
+    def shots(self):
+        return self.detector.shots if self.detector else []
+
+    def stop(self):
+        """Request the running analysis to stop after the current frame"""
+        self.running = False
+
+    @property
+    def adaptive(self):
+        """Whether the sampling stride adapts between skip_frames and max_skip_frames"""
+        return bool(self.max_skip_frames and self.max_skip_frames > self.skip_frames)
+
+    def run(self, start_frame=0, end_frame=None):
+        """Analyze frames [start_frame, end_frame) and return the detected shots"""
+        # The pipeline decoder would pick frames from a stride the reducer is still updating,
+        # and mosaic batches only update the stride when they are flushed
+        if self.adaptive and not self.search_interval:
+            if self.ocr_threads > 1:
+                raise ValueError("adaptive sampling (max_skip_frames) cannot be combined with ocr_threads > 1")
+            if self.batch_frames > 1:
+                raise ValueError("adaptive sampling (max_skip_frames) cannot be combined with batch_frames > 1")
+
+        live_options = {}
+        if self.frame_source == 'live':
+            live_options = {'latency_budget': self.latency_budget, 'skip_frames': self.skip_frames,
+                            'realtime': self.realtime}
+        source = open_source(self.frame_source, self.video_path,
+                             (self.current_ammo_region, self.total_ammo_region), self.ffmpeg_cmd, **live_options)
+        self.profiler = Profiler() if self.profile else NULL_PROFILER
+        self.reader.profiler = self.profiler
+        if self.profile:
+            source = TimedSource(source, self.profiler)
+        self.regions = (source.region(self.current_ammo_region), source.region(self.total_ammo_region))
+        total_frames = source.total_frames
+        fps = source.fps
+        if end_frame is None:
+            end_frame = total_frames
+
+        self.detector = ShotDetector(fps)
+        self.totals = LazyTotal(self.reader, self.lazy_total)
+        self.resumed = None
+        self.last_emitted = None
+        self.checkpointer = None
+        if self.checkpoint_path:
+            try:
+                start_frame = self.load_checkpoint(start_frame, end_frame)
+            except Exception:
+                source.release()
+                raise
+            self.checkpointer = Checkpointer(self.checkpoint_path, self.checkpoint_interval)
+        self.running = True
+        self.start_time = time.time()
+
+        # Change search needs a known end; live/unknown-length input is scanned
+        search = self.search_interval and end_frame > 0
+        self.pipeline = None
+        try:
+            if self.frame_source == 'live':
+                counts = self.live_scan(source)
+            elif search:
+                counts = self.search(source, start_frame, end_frame, total_frames, fps)
+            elif self.ocr_threads > 1:
+                self.pipeline = Pipeline(self, self.ocr_threads, self.queue_size)
+                counts = self.pipeline_scan(source, start_frame, end_frame, total_frames)
+            else:
+                counts = self.scan(source, start_frame, end_frame, total_frames)
+        except BaseException:
+            if self.checkpointer:
+                self.save_checkpoint()
+            raise
+        finally:
+            source.release()
+            self.reader.flush()
+
+        if self.checkpointer:
+            if self.running:
+                self.checkpointer.remove()
+            else:
+                self.save_checkpoint()
+
+        elapsed = time.time() - self.start_time
+        self.summary = {
+            'video': self.video_path,
+            'completed': self.running,
+            'total_frames': total_frames,
+            'video_fps': fps,
+            'shots': len(self.detector.shots),
+            'elapsed': elapsed,
+            'ocr': dict(self.reader.stats, **self.totals.stats()),
+            'combo_order': self.reader.combo_order,
+        }
+        self.summary.update(counts)
+        if self.resumed:
+            self.summary['resumed_from'] = self.resumed['frame']
+        if self.checkpointer:
+            self.summary['checkpoints'] = self.checkpointer.writes
+        if self.pipeline:
+            self.summary['pipeline'] = self.pipeline.report(elapsed)
+        self.summary['analysis_fps'] = self.summary['frames_covered'] / elapsed if elapsed > 0 else 0
+        if self.profile:
+            self.summary['profile'] = self.profiler.report(elapsed)
+            if self.profile_path:
+                write_profile(self.profile_path, self.summary['profile'])
+        self.running = False
+
+        return self.detector.shots
+
+    def report_progress(self, frame_count, start_frame, total_frames):
+        if self.on_progress:
+            elapsed = time.time() - self.start_time
+            fps_actual = (frame_count - start_frame) / elapsed if elapsed > 0 else 0
+            self.on_progress(frame_count, total_frames, fps_actual)
+
+    def adaptive_stride(self):
+        """Stride scheduler for this run (restored when resuming), None for a fixed skip_frames"""
+        if self.adaptive:
+            stride = AdaptiveStride(self.skip_frames, self.max_skip_frames)
+            if self.resumed and self.resumed.get('stride'):
+                stride.stride, stride.previous = self.resumed['stride']
+            return stride
+        return None
+
+    def first_frame(self, start_frame):
+        """Frame number of the first frame analyzed after start_frame"""
+        if self.stride and self.resumed:
+            return start_frame + self.stride.stride
+        # Fixed stride keeps analyzed frames on multiples of skip_frames (segment-independent)
+        return (start_frame // self.skip_frames + 1) * self.skip_frames
+
+    def checkpoint_params(self, end_frame):
+        """Settings a checkpoint is only valid for"""
+        return {
+            'current_ammo_region': list(self.current_ammo_region),
+            'total_ammo_region': list(self.total_ammo_region) if self.total_ammo_region else None,
+            'skip_frames': self.skip_frames,
+            'max_skip_frames': self.max_skip_frames,
+            'search_interval': self.search_interval,
+            'end_frame': end_frame,
+        }
+
+    def load_checkpoint(self, start_frame, end_frame):
+        """Restore the detector from the checkpoint when resuming, returns the frame to start from"""
+        self.fingerprint = video_fingerprint(self.video_path)
+        self.params = self.checkpoint_params(end_frame)
+        state = read_checkpoint(self.checkpoint_path) if self.resume else None
+        if state is None or state['frame'] <= start_frame:
+            return start_frame
+
+        check_resumable(state, self.fingerprint, self.params)
+        detector = self.detector
+        detector.previous_ammo = state['previous_ammo']
+        detector.shots = state['shots']
+        detector.first_reading = tuple(state['first_reading']) if state['first_reading'] else None
+        detector.last_reading = tuple(state['last_reading']) if state['last_reading'] else None
+        self.resumed = state
+        self.last_emitted = state['frame']
+        return state['frame']
+
+    def save_checkpoint(self):
+        """Write the state after the last emitted frame (nothing before the first one)"""
+        frame_count = self.last_emitted
+        if frame_count is None:
+            return
+        detector = self.detector
+        self.checkpointer.save({
+            'version': CHECKPOINT_VERSION,
+            'video': self.video_path,
+            'fingerprint': self.fingerprint,
+            'params': self.params,
+            'frame': frame_count,
+            'previous_ammo': detector.previous_ammo,
+            'stride': [self.stride.stride, self.stride.previous] if self.stride else None,
+            'first_reading': detector.first_reading,
+            'last_reading': detector.last_reading,
+            'shots': detector.shots,
+            'saved': time.time(),
+        })
+
+    def scan(self, source, start_frame, end_frame, total_frames):
+        """Sequential pass analyzing every skip_frames-th frame"""
+        if start_frame > 0:
+            source.seek(start_frame)
+
+        frame_count = start_frame
+        analyzed = 0
+
+        self.stride = self.adaptive_stride()
+
+        next_frame = self.first_frame(start_frame)
+        next_report = (start_frame // self.progress_interval + 1) * self.progress_interval
+
+        while self.running and (end_frame <= 0 or frame_count < end_frame):
+            # Frames that will not be analyzed are only grabbed, never converted
+            if frame_count + 1 < next_frame:
+                if not source.skip():
+                    break
+                frame_count += 1
+                continue
+
+            frame = source.read()
+            if frame is None:
+                break
+
+            frame_count += 1
+            analyzed += 1
+            self.process_frame(frame, frame_count)
+            next_frame = frame_count + (self.stride.stride if self.stride else self.skip_frames)
+
+            if frame_count >= next_report:
+                self.report_progress(frame_count, start_frame, total_frames)
+                next_report += self.progress_interval * ((frame_count - next_report) // self.progress_interval + 1)
+        if self.batch:
+            self.flush_batch()
+
+        return {
+            'frames_decoded': frame_count - start_frame,
+            'frames_analyzed': analyzed,
+            'frames_covered': frame_count - start_frame,
+            'average_stride': (frame_count - start_frame) / analyzed if analyzed else 0,
+        }
+
+    def live_scan(self, source):
+        """Live input: OCR frames as they arrive; the source drops what the budget cannot cover
+
+        Reports the processing latency (frame arrival -> readings emitted) of
+        every analyzed frame and of the frames that produced a shot, plus how
+        far the emitted frames lagged behind the stream clock.
+        """
+        latency = StageStats()
+        shot_latency = StageStats()
+        behind = StageStats()
+        first = None
+        analyzed = 0
+        next_report = self.progress_interval
+
+        while self.running:
+            try:
+                item = source.next(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            frame_count, arrival, frame = item
+            if first is None:
+                first = (frame_count, arrival)
+            shots = len(self.detector.shots)
+
+            self.emit(frame_count, *self.read_frame(frame))
+            analyzed += 1
+
+            now = time.monotonic()
+            latency.add(now - arrival)
+            if len(self.detector.shots) > shots:
+                shot_latency.add(now - arrival)
+            # Stream clock: the first frame arrived on time, the rest every 1/fps after it
+            behind.add(max(0.0, now - first[1] - (frame_count - first[0]) / source.fps))
+
+            if frame_count >= next_report:
+                self.report_progress(frame_count, first[0] - 1, 0)
+                next_report = frame_count + self.progress_interval
+
+        live = source.stats()
+        live['latency_budget'] = self.latency_budget
+        live['latency'] = latency.report()
+        live['shot_latency'] = shot_latency.report()
+        live['behind_stream'] = behind.report()
+        return {
+            'frames_decoded': live['frames_received'],
+            'frames_analyzed': analyzed,
+            'frames_covered': live['frames_received'],
+            'average_stride': live['frames_received'] / analyzed if analyzed else 0,
+            'live': live,
+        }
+
+    def pipeline_scan(self, source, start_frame, end_frame, total_frames):
+        """Same frames as scan(), decoded, OCR'd and reduced by concurrent stages"""
+        self.stride = self.adaptive_stride()
+        if start_frame > 0:
+            source.seek(start_frame)
+        return self.pipeline.run(source, start_frame, end_frame, total_frames)
+
+    def search(self, source, start_frame, end_frame, total_frames, fps):
+        """Coarse-to-fine pass: OCR sparse samples, bisect to the exact frame of every change
+
+        Shots get the same frame numbers as a skip_frames=1 scan, as long as the
+        counter does not change and change back between two samples.
+        """
+        stride = max(2, int(round(self.search_interval * fps)))
+        readings = {}
+        # Total crops of the probed frames: only the changes are emitted, so only they are
+        # read (with or without lazy_total; a probe's previous reading is not known yet)
+        totals = {}
+
+        def analyze(frame, frame_count):
+            current_region, total_region = self.regions
+            current_ammo = self.reader.read(frame, current_region)
+            readings[frame_count] = current_ammo
+            if current_ammo is not None:
+                totals[frame_count] = self.totals.snapshot(frame, total_region)
+            return current_ammo
+
+        access = RandomAccess(source, analyze, max_gap=stride)
+        access.start_at(start_frame)
+
+        next_report = [start_frame + self.progress_interval]
+
+        def read(frame_count):
+            # Stop probing once stop() was requested
+            if not self.running:
+                return None
+            if frame_count >= next_report[0]:
+                self.report_progress(frame_count, start_frame, total_frames)
+                next_report[0] = frame_count + self.progress_interval
+            return access(frame_count)
+
+        last_frame = start_frame
+        for frame_count, current_ammo in ChangeSearch(read, stride).changes(start_frame + 1, end_frame):
+            if not self.running:
+                break
+            roi, region = totals.pop(frame_count)
+            self.emit(frame_count, current_ammo,
+                      self.totals.read(roi, region, current_ammo, self.detector.previous_ammo))
+            last_frame = frame_count
+            # Changes come in frame order: earlier crops are never read
+            unread = [probed for probed in totals if probed < frame_count]
+            for probed in unread:
+                del totals[probed]
+            self.totals.skips += len(unread)
+        self.totals.skips += len(totals)
+
+        # The last reading of the range (segment merging compares it with the next segment)
+        if self.running:
+            for frame_count in range(end_frame, last_frame, -1):
+                if readings.get(frame_count) is not None:
+                    self.detector.last_reading = (frame_count, readings[frame_count], self.totals.value)
+                    break
+
+        return {
+            'frames_decoded': access.decoded,
+            'frames_analyzed': len(readings),
+            'frames_covered': (max(access.memo) if access.memo else start_frame) - start_frame,
+            'search_stride': stride,
+            'seeks': access.seeks,
+        }
+
+    def read_frame(self, frame):
+        """(current_ammo, total_ammo) of one frame, read in frame order"""
+        current_region, total_region = self.regions
+        current_ammo = self.reader.read(frame, current_region)
+        return current_ammo, self.totals.read(frame, total_region, current_ammo, self.detector.previous_ammo)
+
+    def process_frame(self, frame, frame_count):
+        """OCR both regions of one frame and feed the shot detector"""
+        if self.batcher:
+            self.queue_frame(frame, frame_count)
+            return None
+
+        return self.emit(frame_count, *self.read_frame(frame))
+
+    def queue_frame(self, frame, frame_count):
+        """Batch mode: resolve cheap reads now, defer the rest to the next mosaic"""
+        current_region, total_region = self.regions
+        self.batch.append((
+            frame_count,
+            self.reader.lookup(frame, current_region),
+            self.totals.snapshot(frame, total_region),
+        ))
+        if len(self.batch) >= self.batch_frames:
+            self.flush_batch()
+
+    def flush_batch(self):
+        """OCR all pending crops of the batch at once and emit the frames in order
+
+        Current ammo goes first; the total crops that are due given those
+        readings (see LazyTotal) are read in a second mosaic.
+        """
+        batch, self.batch = self.batch, []
+        values = iter(self.batcher.resolve([pending for _, (_, pending), _ in batch if pending is not None]))
+
+        readings = []
+        previous_ammo = self.detector.previous_ammo
+        for frame_count, (current_ammo, pending), (roi, region) in batch:
+            if pending is not None:
+                current_ammo = next(values)
+            total = self.reader.lookup(roi, region) if self.totals.due(roi, current_ammo, previous_ammo) else None
+            readings.append((frame_count, current_ammo, total))
+            if current_ammo is not None:
+                previous_ammo = current_ammo
+
+        values = iter(self.batcher.resolve([total[1] for _, _, total in readings
+                                            if total and total[1] is not None]))
+        for frame_count, current_ammo, total in readings:
+            if total:
+                self.totals.value = total[0] if total[1] is None else next(values)
+            self.emit(frame_count, current_ammo, self.totals.value)
+
+    def emit(self, frame_count, current_ammo, total_ammo):
+        """Publish one frame's readings and feed the shot detector"""
+        if self.on_ammo:
+            self.on_ammo(total_ammo, current_ammo, frame_count)
+
+        with self.profiler.time('detect'):
+            if self.stride:
+                self.stride.update(current_ammo)
+            shot = self.detector.update(frame_count, current_ammo, total_ammo)
+
+        if shot and self.on_shot:
+            self.on_shot(shot, len(self.detector.shots))
+
+        self.last_emitted = frame_count
+        if self.checkpointer and self.checkpointer.due():
+            self.save_checkpoint()
+
+        return shot
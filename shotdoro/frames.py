@@ -0,0 +1,170 @@
+"""Frame sources for the analysis loop"""
+
+import os
+import shutil
+import subprocess
+
+import cv2
+import numpy as np
+
+
+class CaptureSource:
+    """cv2.VideoCapture frames; skipped frames are grabbed but never decoded to BGR
+
+    grab() only demuxes and decodes the compressed frame into the decoder's own
+    buffer; the BGR conversion and the NumPy allocation happen in retrieve(),
+    which is called only for frames that are actually analyzed.
+    """
+
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video: {video_path}")
+
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+
+    def region(self, region):
+        """Full frames: regions apply unchanged"""
+        return region
+
+    def seek(self, frame_index):
+        """Position the source so the next frame is `frame_index` (0-based)"""
+        if frame_index > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+
+    def skip(self):
+        """Advance one frame without converting it, False at end of stream"""
+        return self.cap.grab()
+
+    def read(self):
+        """Next frame as a BGR array, None at end of stream"""
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+def union_region(regions, width, height):
+    """Bounding box of the given regions clipped to the frame"""
+    regions = [region for region in regions if region is not None]
+    x1 = max(0, min(region[0] for region in regions))
+    y1 = max(0, min(region[1] for region in regions))
+    x2 = min(width, max(region[2] for region in regions))
+    y2 = min(height, max(region[3] for region in regions))
+    if x2 <= x1 or y2 <= y1:
+        raise ValueError("Ammo regions are outside the video frame")
+    return x1, y1, x2, y2
+
+
+class FfmpegSource:
+    """Grayscale frames of just the ammo regions, decoded and cropped by ffmpeg
+
+    ffmpeg crops every frame to the union bounding box of the regions and
+    converts it to gray8 before it reaches the pipe, so only a few kilobytes per
+    frame cross into Python instead of a full BGR frame. Frames are read into
+    one reused buffer: the array returned by read() is overwritten by the next
+    read() or skip(). Use region() to map full-frame regions onto the crop.
+    """
+
+    def __init__(self, video_path, regions, ffmpeg_cmd='ffmpeg'):
+        self.video_path = video_path
+        self.ffmpeg_cmd = self.find_ffmpeg(ffmpeg_cmd)
+
+        # Frame count, rate and size come from OpenCV so both sources number frames alike
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                raise IOError(f"Cannot open video: {video_path}")
+            self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.fps = cap.get(cv2.CAP_PROP_FPS) or 30
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            cap.release()
+
+        self.crop = union_region(regions, width, height)
+        x1, y1, x2, y2 = self.crop
+        self.buffer = np.empty((y2 - y1, x2 - x1), np.uint8)
+        self.view = memoryview(self.buffer).cast('B')
+
+        self.start_frame = 0
+        self.process = None
+
+    @staticmethod
+    def find_ffmpeg(ffmpeg_cmd):
+        """Full path of the ffmpeg executable (IOError if missing)"""
+        path = shutil.which(ffmpeg_cmd) or ffmpeg_cmd
+        if not os.path.isfile(path):
+            raise IOError(f"ffmpeg not found: {ffmpeg_cmd}")
+        return path
+
+    def region(self, region):
+        """Translate a full-frame region into crop coordinates"""
+        if region is None:
+            return None
+        x1, y1, _, _ = self.crop
+        return region[0] - x1, region[1] - y1, region[2] - x1, region[3] - y1
+
+    def command(self):
+        x1, y1, x2, y2 = self.crop
+        # Stopping before the end of the video breaks the pipe, which ffmpeg logs as an error
+        cmd = [self.ffmpeg_cmd, '-v', 'fatal', '-nostdin']
+        if self.start_frame > 0:
+            # Input seeking decodes up to the timestamp; half a frame early keeps the target frame
+            cmd += ['-ss', f'{(self.start_frame - 0.5) / self.fps:.6f}']
+        # exact=1: without it odd crop sizes/offsets of 4:2:0 video are rounded and rows shear
+        cmd += ['-i', self.video_path, '-an', '-sn',
+                '-vf', f'crop={x2 - x1}:{y2 - y1}:{x1}:{y1}:exact=1,format=gray',
+                '-vsync', 'passthrough', '-f', 'rawvideo', '-pix_fmt', 'gray', '-']
+        return cmd
+
+    def start(self):
+        self.process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                                        bufsize=self.buffer.nbytes * 4)
+
+    def seek(self, frame_index):
+        """Set the first frame to decode (before reading starts)"""
+        self.release()
+        self.start_frame = frame_index
+
+    def fill(self):
+        """Read one frame from the pipe into the buffer, False at end of stream"""
+        if self.process is None:
+            self.start()
+
+        filled = 0
+        while filled < self.buffer.nbytes:
+            count = self.process.stdout.readinto(self.view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def skip(self):
+        return self.fill()
+
+    def read(self):
+        return self.buffer if self.fill() else None
+
+    def release(self):
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate()
+            self.process.stdout.close()
+            self.process.wait()
+            self.process = None
+
+
+def open_source(kind, video_path, regions=(), ffmpeg_cmd='ffmpeg', **live_options):
+    """Frame source by name: 'opencv' (full BGR frames), 'ffmpeg' (cropped gray) or 'live'"""
+    if kind == 'opencv':
+        return CaptureSource(video_path)
+    if kind == 'ffmpeg':
+        return FfmpegSource(video_path, regions, ffmpeg_cmd)
+    if kind == 'live':
+        from .live import LiveSource  # live.py builds on this module
+        return LiveSource(video_path, regions, ffmpeg_cmd, **live_options)
+    raise ValueError(f"Unknown frame source: {kind}")
@@ -0,0 +1,123 @@
+"""Per-video digit template recognizer bootstrapped from Tesseract readings"""
+
+import cv2
+import numpy as np
+
+
+def binarize(gray):
+    """Otsu binarization with the digits as white foreground"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    # Digits cover less area than the HUD background
+    if cv2.countNonZero(binary) > binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+
+def segment(binary, min_height_ratio=0.4):
+    """Split a binary crop into per-digit images, left to right"""
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return []
+
+    boxes = stats[1:]
+    max_height = boxes[:, cv2.CC_STAT_HEIGHT].max()
+    keep = (boxes[:, cv2.CC_STAT_HEIGHT] >= max_height * min_height_ratio) & (boxes[:, cv2.CC_STAT_AREA] >= 4)
+    boxes = boxes[keep]
+    boxes = boxes[np.argsort(boxes[:, cv2.CC_STAT_LEFT])]
+
+    # Merge horizontally overlapping components (broken strokes of one digit)
+    merged = []
+    for x, y, w, h, _ in boxes:
+        if merged and x < merged[-1][2]:
+            box = merged[-1]
+            merged[-1] = [box[0], min(box[1], y), max(box[2], x + w), max(box[3], y + h)]
+        else:
+            merged.append([x, y, x + w, y + h])
+
+    return [binary[y1:y2, x1:x2] for x1, y1, x2, y2 in merged]
+
+
+class GlyphRecognizer:
+    """Classifies digits by normalized correlation against learned glyph templates
+
+    The first `bootstrap` crops are read by Tesseract; whenever the reading has
+    as many digits as the crop has glyphs, each glyph becomes a template for its
+    digit. Once bootstrapped, crops are classified by one matrix product against
+    all templates; `classify` reports the weakest glyph score as confidence so
+    the caller can fall back to Tesseract (and keep learning) when it is low.
+    """
+
+    def __init__(self, bootstrap=100, min_confidence=0.85, glyph_size=(12, 20), max_per_digit=8):
+        self.bootstrap = bootstrap
+        self.min_confidence = min_confidence
+        self.glyph_size = glyph_size
+        self.max_per_digit = max_per_digit
+
+        self.samples = {}  # digit -> list of glyph vectors
+        self.learned = 0
+        self.matrix = None  # stacked templates (n x D)
+        self.labels = None  # digit of each template row
+
+    @property
+    def ready(self):
+        return self.learned >= self.bootstrap and bool(self.samples)
+
+    def vectorize(self, glyphs):
+        """Zero-mean, unit-norm vectors (k x D) of glyph images"""
+        vectors = np.stack([
+            cv2.resize(glyph, self.glyph_size, interpolation=cv2.INTER_AREA).ravel()
+            for glyph in glyphs
+        ]).astype(np.float32)
+        vectors -= vectors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-6)
+
+    def learn(self, gray, value):
+        """Add templates from a crop whose value Tesseract recognized"""
+        if value is None:
+            return False
+
+        digits = str(value)
+        glyphs = segment(binarize(gray))
+        if len(glyphs) != len(digits):
+            return False
+
+        self.learned += 1
+        for digit, vector in zip(digits, self.vectorize(glyphs)):
+            samples = self.samples.setdefault(digit, [])
+
+            # Keep distinct exemplars only
+            if samples and max(float(np.dot(s, vector)) for s in samples) > 0.98:
+                continue
+            if len(samples) < self.max_per_digit:
+                samples.append(vector)
+                self.matrix = None
+
+        return True
+
+    def templates(self):
+        """Template matrix and labels (rebuilt after learning)"""
+        if self.matrix is None:
+            labels = []
+            rows = []
+            for digit, samples in self.samples.items():
+                labels.extend([digit] * len(samples))
+                rows.extend(samples)
+            self.matrix = np.stack(rows)
+            self.labels = labels
+        return self.matrix, self.labels
+
+    def classify(self, gray):
+        """Return (value, confidence); value is None when nothing was segmented"""
+        glyphs = segment(binarize(gray))
+        if not glyphs or not self.samples:
+            return None, 0.0
+
+        matrix, labels = self.templates()
+        scores = self.vectorize(glyphs) @ matrix.T
+        best = scores.argmax(axis=1)
+
+        digits = ''.join(labels[i] for i in best)
+        confidence = float(scores[np.arange(len(best)), best].min())
+        return int(digits), confidence
@@ -0,0 +1,198 @@
+"""Live input: frames of a growing file, named pipe or stream URL, analyzed under a latency budget"""
+
+import os
+import queue
+import re
+import stat
+import subprocess
+import threading
+import time
+from collections import deque
+from fractions import Fraction
+
+import numpy as np
+
+from .frames import FfmpegSource, union_region
+
+# yuv4mpeg stream header: 'YUV4MPEG2 W98 H56 F30:1 Ip A0:0 Cmono ...'
+Y4M_HEADER = re.compile(rb'W(\d+) H(\d+) F(\d+):(\d+)')
+
+# Large enough for any frame: the crop is only clamped to the real size by ffmpeg
+UNKNOWN_SIZE = 1 << 16
+
+
+def input_kind(path, idle_timeout=10.0):
+    """'file' (still being written: read while it grows), 'replay' (finished file), 'pipe' (named pipe) or 'url'"""
+    if not os.path.exists(path):
+        return 'url'
+    info = os.stat(path)
+    if stat.S_ISFIFO(info.st_mode):
+        return 'pipe'
+    # Following a finished file would wait idle_timeout at its end (forever for
+    # formats that seek to an index there, like AVI)
+    return 'file' if time.time() - info.st_mtime < idle_timeout else 'replay'
+
+
+class LiveSource:
+    """Cropped gray frames of a live input, delivered newest-first once analysis falls behind
+
+    One ffmpeg process decodes the input (following a growing file, reading a
+    named pipe or a stream URL) into a yuv4mpeg pipe, whose header carries the
+    crop size and frame rate. A reader thread drains the pipe as fast as
+    frames arrive, stamping each with its arrival time. Only every
+    skip_frames-th frame is queued; the queue holds at most `queue_frames`
+    frames and drops the oldest when full. next() also discards queued frames
+    older than `latency_budget` seconds as long as a newer one is waiting, so
+    OCR always works on recent frames and the backlog never grows.
+    """
+
+    def __init__(self, path, regions, ffmpeg_cmd='ffmpeg', latency_budget=0.5, skip_frames=1,
+                 queue_frames=None, realtime=False, idle_timeout=10.0, fps=None):
+        self.path = path
+        self.ffmpeg_cmd = FfmpegSource.find_ffmpeg(ffmpeg_cmd)
+        self.kind = input_kind(path, idle_timeout)
+        self.latency_budget = latency_budget
+        self.skip_frames = max(1, int(skip_frames))
+        self.realtime = realtime
+        self.idle_timeout = idle_timeout
+
+        self.crop = union_region(regions, UNKNOWN_SIZE, UNKNOWN_SIZE)
+        self.shape = None
+        self.total_frames = 0
+        self.fps = fps
+
+        self.frames = deque()
+        self.queue_frames = queue_frames
+        self.ready = threading.Condition()
+        self.ended = False
+
+        self.received = 0
+        self.dropped_overflow = 0
+        self.dropped_stale = 0
+        self.log = deque(maxlen=20)
+
+        self.process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        stdin=subprocess.DEVNULL)
+        self.logger = threading.Thread(target=self.watch_log, name='shotdoro-live-log', daemon=True)
+        self.logger.start()
+
+        # The stream header arrives once ffmpeg has opened the input
+        self.info = threading.Event()
+        threading.Thread(target=self.pump, name='shotdoro-live-read', daemon=True).start()
+        if not self.info.wait(idle_timeout) or self.shape is None:
+            self.release()
+            self.logger.join(1)
+            reason = ' | '.join(self.log) or f"no video after {idle_timeout}s"
+            raise IOError(f"Cannot read live input {path}: {reason}")
+
+    def command(self):
+        x1, y1, x2, y2 = self.crop
+        cmd = [self.ffmpeg_cmd, '-hide_banner', '-nostdin', '-v', 'error']
+        if self.kind == 'file':
+            # Keep reading at the end of the file until it stops growing for idle_timeout
+            cmd += ['-follow', '1', '-rw_timeout', str(int(self.idle_timeout * 1e6))]
+        elif self.kind != 'replay':
+            cmd += ['-fflags', 'nobuffer', '-flags', 'low_delay']
+        if self.realtime:
+            cmd += ['-re']
+        cmd += ['-i', self.path, '-an', '-sn',
+                '-vf', f'crop={x2 - x1}:{y2 - y1}:{x1}:{y1}:exact=1,format=gray',
+                '-vsync', 'passthrough', '-f', 'yuv4mpegpipe', '-pix_fmt', 'gray', '-']
+        return cmd
+
+    def watch_log(self):
+        """Keep ffmpeg's last error lines for error messages (and keep its stderr drained)"""
+        for line in iter(self.process.stderr.readline, b''):
+            line = line.decode('utf-8', 'replace').strip()
+            if line:
+                self.log.append(line)
+
+    def read_header(self, stdout):
+        """Crop size and frame rate from the yuv4mpeg header"""
+        match = Y4M_HEADER.search(stdout.readline())
+        if match:
+            width, height, rate, scale = (int(value) for value in match.groups())
+            self.shape = (height, width)
+            self.fps = self.fps or float(Fraction(rate, scale or 1)) or 30
+            if self.queue_frames is None:
+                self.queue_frames = max(2, int(self.latency_budget * self.fps / self.skip_frames))
+        self.info.set()
+
+    def pump(self):
+        """Reader thread: drain the pipe, stamp and queue every skip_frames-th frame"""
+        stdout = self.process.stdout
+        try:
+            self.read_header(stdout)
+            if self.shape is None:
+                return
+            size = self.shape[0] * self.shape[1]
+            while True:
+                # Every frame is 'FRAME[ params]\n' followed by the gray plane
+                if not stdout.readline().startswith(b'FRAME'):
+                    break
+                data = stdout.read(size)
+                if len(data) < size:
+                    break
+                arrival = time.monotonic()
+                self.received += 1
+                if self.received % self.skip_frames:
+                    continue
+
+                frame = np.frombuffer(data, np.uint8).reshape(self.shape)
+                with self.ready:
+                    if len(self.frames) >= self.queue_frames:
+                        self.frames.popleft()
+                        self.dropped_overflow += 1
+                    self.frames.append((self.received, arrival, frame))
+                    self.ready.notify()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.info.set()
+            with self.ready:
+                self.ended = True
+                self.ready.notify_all()
+
+    def region(self, region):
+        """Translate a full-frame region into crop coordinates"""
+        if region is None:
+            return None
+        x1, y1, _, _ = self.crop
+        return region[0] - x1, region[1] - y1, region[2] - x1, region[3] - y1
+
+    def next(self, timeout=None):
+        """(frame_count, arrival, frame) of the next frame within the budget, None at end of stream
+
+        Raises queue.Empty if nothing arrived within `timeout` seconds.
+        """
+        with self.ready:
+            if not self.ready.wait_for(lambda: self.frames or self.ended, timeout):
+                raise queue.Empty
+            if not self.frames:
+                return None
+
+            item = self.frames.popleft()
+            now = time.monotonic()
+            while self.frames and now - item[1] > self.latency_budget:
+                self.dropped_stale += 1
+                item = self.frames.popleft()
+            return item
+
+    def stats(self):
+        return {
+            'input': self.kind,
+            'frames_received': self.received,
+            'dropped_overflow': self.dropped_overflow,
+            'dropped_stale': self.dropped_stale,
+            'queue_frames': self.queue_frames,
+        }
+
+    def release(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
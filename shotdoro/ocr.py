@@ -0,0 +1,341 @@
+import re
+import threading
+
+import cv2
+import numpy as np
+
+from .glyphs import GlyphRecognizer
+from .ocr_cache import OcrCache
+from .predict import ValuePredictor
+from .tesseract_api import get_backend
+from .timing import NULL_PROFILER
+
+
+# Threshold strategies tried by the cascade (name -> builder)
+THRESHOLDS = {
+    'otsu': lambda gray: cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
+    'fixed127': lambda gray: cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)[1],
+    'otsu_inv': lambda gray: cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1],
+}
+
+# Tesseract page segmentation modes tried for every threshold
+PSM_MODES = [8, 7, 13]
+
+MORPH_KERNEL = np.ones((2, 2), np.uint8)
+
+
+def parse_number(text):
+    """Return the first integer found in OCR text, or None"""
+    numbers = re.findall(r'\d+', text.strip())
+    if numbers:
+        return int(numbers[0])
+    return None
+
+
+def combo_name(combo):
+    """Display name of a (threshold, psm) cascade attempt"""
+    return f"{combo[0]}/psm{combo[1]}"
+
+
+def estimated_calls_saved(stats):
+    """Approximate Tesseract calls avoided by gate skips (average calls per recognition)"""
+    recognitions = stats.get('recognitions', 0)
+    if not recognitions:
+        return 0
+    return int(round(stats.get('gate_skips', 0) * stats.get('ocr_calls', 0) / recognitions))
+
+
+def prediction_hit_rate(stats):
+    """Share of prediction checks answered without the glyph/Tesseract paths"""
+    checks = stats.get('predict_hits', 0) + stats.get('predict_misses', 0)
+    return stats.get('predict_hits', 0) / checks if checks else 0.0
+
+
+class RoiChangeGate:
+    """Skips OCR while a region's pixels match the last OCR'd crop
+
+    The crop is area-downsampled by `cell` pixels and compared cell by cell; if no
+    cell moved more than `threshold` gray levels the previous reading is reused.
+    Lower threshold = more sensitive (0 only reuses pixel-identical cells).
+    """
+
+    def __init__(self, threshold=10, cell=4):
+        self.threshold = threshold
+        self.cell = max(1, int(cell))
+        self.last = {}  # region -> (signature, value)
+
+    def signature(self, roi):
+        """Downsampled copy of the crop"""
+        height, width = roi.shape[:2]
+        size = (max(1, width // self.cell), max(1, height // self.cell))
+        return cv2.resize(roi, size, interpolation=cv2.INTER_AREA)
+
+    def lookup(self, key, roi):
+        """Return (unchanged, previous value, signature of roi)"""
+        signature = self.signature(roi)
+        previous = self.last.get(key)
+
+        if previous is not None and previous[0].shape == signature.shape:
+            if cv2.absdiff(previous[0], signature).max() <= self.threshold:
+                return True, previous[1], signature
+
+        return False, None, signature
+
+    def store(self, key, signature, value):
+        """Remember the crop that was just OCR'd"""
+        self.last[key] = (signature, value)
+
+    def reset(self):
+        self.last.clear()
+
+
+class DigitReader:
+    """Reads an ammo counter from a frame region with a threshold x psm Tesseract cascade
+
+    One reader may be shared by several OCR threads: counters and the cascade
+    order are updated under a lock, the glyph templates and the value
+    exemplars under their own.
+    """
+
+    def __init__(self, upscale=4, thresholds=('otsu', 'fixed127', 'otsu_inv'), psm_modes=(8, 7, 13),
+                 gate_threshold=None, gate_cell=4, cache_size=None, cache_path=None,
+                 glyphs=False, glyph_bootstrap=100, glyph_confidence=0.85, backend='pytesseract',
+                 adaptive=None, warmup=200, reorder_every=10, predict=False, predict_confidence=0.97):
+        self.upscale = upscale
+        self.thresholds = list(thresholds)
+        self.psm_modes = list(psm_modes)
+
+        # Cascade attempts in try order; 'reorder' re-sorts them by hit rate during the
+        # run, 'pin' does the same but freezes the order after `warmup` recognitions
+        self.combos = [(t, psm) for t in self.thresholds for psm in self.psm_modes]
+        self.adaptive = adaptive
+        self.warmup = warmup
+        self.reorder_every = max(1, reorder_every)
+        self.pinned = False
+
+        # OCR engine: 'pytesseract' (process per call) or 'capi' (pooled in-process engines)
+        self.backend = get_backend(backend)
+
+        # Optional change gate (None = OCR every read)
+        self.gate = RoiChangeGate(gate_threshold, gate_cell) if gate_threshold is not None else None
+
+        # Optional OCR memo cache (None = no memoization)
+        self.cache = None
+        if cache_size or cache_path:
+            namespace = f"{self.upscale}|{sorted(self.thresholds)}|{sorted(self.psm_modes)}"
+            self.cache = OcrCache(cache_size or 4096, cache_path, namespace)
+
+        # Optional self-trained template recognizer (Tesseract only as fallback)
+        self.glyphs = GlyphRecognizer(glyph_bootstrap, glyph_confidence) if glyphs else None
+
+        # Optional prediction check: previous value, one less and reload values are
+        # verified against exemplars of earlier Tesseract readings before anything else
+        self.predictor = ValuePredictor(predict_confidence) if predict else None
+
+        # Stage timing (set by the engine when profiling is enabled)
+        self.profiler = NULL_PROFILER
+
+        self.lock = threading.Lock()
+        self.glyph_lock = threading.Lock()
+        self.predict_lock = threading.Lock()
+        self.stats = {
+            'reads': 0,
+            'gate_skips': 0,
+            'cache_hits': 0,
+            'predict_hits': 0,
+            'predict_misses': 0,
+            'glyph_hits': 0,
+            'glyph_fallbacks': 0,
+            'recognitions': 0,
+            'ocr_calls': 0,
+            'combos': {combo_name(combo): {'attempts': 0, 'hits': 0} for combo in self.combos},
+        }
+
+    def crop(self, frame, region):
+        """Cut the region out of a frame (None if empty)"""
+        if region is None:
+            return None
+
+        x1, y1, x2, y2 = region
+        roi = frame[y1:y2, x1:x2]
+
+        if roi.size == 0:
+            return None
+        return roi
+
+    def preprocess(self, roi):
+        """Grayscale, enlarge and denoise a ROI crop"""
+        gray = roi if roi.ndim == 2 else cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+
+        # Enlarge for better OCR accuracy
+        if roi.shape[0] < 50 or roi.shape[1] < 50:
+            gray = cv2.resize(gray, None, fx=self.upscale, fy=self.upscale, interpolation=cv2.INTER_CUBIC)
+
+        # Noise removal
+        return cv2.medianBlur(gray, 3)
+
+    def binarize(self, gray, threshold):
+        """Apply one threshold strategy followed by morphological cleanup"""
+        with self.profiler.time('threshold'):
+            thresh = THRESHOLDS[threshold](gray)
+            thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, MORPH_KERNEL)
+            return cv2.morphologyEx(thresh, cv2.MORPH_OPEN, MORPH_KERNEL)
+
+    def count(self, key, amount=1):
+        """Thread-safe stats counter increment"""
+        with self.lock:
+            self.stats[key] += amount
+
+    def ocr(self, image, psm):
+        """Single Tesseract call returning an integer or None"""
+        self.count('ocr_calls')
+        with self.profiler.time('tesseract'):
+            text = self.backend.image_to_string(image, psm)
+        return parse_number(text)
+
+    def recognize(self, gray):
+        """Run the threshold x psm cascade on a preprocessed crop"""
+        binaries = {}
+        number = None
+
+        # adapt_order() rebinds self.combos, so this list stays intact while we walk it
+        for combo in self.combos:
+            threshold, psm = combo
+            if threshold not in binaries:
+                binaries[threshold] = self.binarize(gray, threshold)
+
+            counts = self.stats['combos'][combo_name(combo)]
+            with self.lock:
+                counts['attempts'] += 1
+            try:
+                number = self.ocr(binaries[threshold], psm)
+            except Exception:
+                continue
+            if number is not None:
+                with self.lock:
+                    counts['hits'] += 1
+                break
+
+        if self.adaptive:
+            with self.lock:
+                self.adapt_order()
+        return number
+
+    def adapt_order(self):
+        """Move the combos that win most often to the front of the cascade"""
+        if self.pinned:
+            return
+
+        recognitions = self.stats['recognitions']
+        if recognitions % self.reorder_every == 0 or (self.adaptive == 'pin' and recognitions >= self.warmup):
+            index = {combo: i for i, combo in enumerate(self.combos)}
+
+            def hit_rate(combo):
+                counts = self.stats['combos'][combo_name(combo)]
+                # Laplace prior: combos rarely reached are not written off
+                return -(counts['hits'] + 1) / (counts['attempts'] + 2), index[combo]
+
+            self.combos = sorted(self.combos, key=hit_rate)
+
+        if self.adaptive == 'pin' and recognitions >= self.warmup:
+            self.pinned = True
+
+    @property
+    def combo_order(self):
+        return [combo_name(combo) for combo in self.combos]
+
+    def flush(self):
+        """Persist cached results (called at the end of a run)"""
+        if self.cache:
+            self.cache.flush()
+
+    def lookup(self, frame, region):
+        """Try the cheap paths (gate, cache, prediction, glyph templates) for one region
+
+        Returns (value, None) when resolved, or (None, pending) when the crop still
+        needs Tesseract; pass the pending dict and its OCR result to complete().
+        """
+        roi = self.crop(frame, region)
+        if roi is None:
+            return None, None
+
+        self.count('reads')
+
+        signature = None
+        if self.gate:
+            with self.profiler.time('gate'):
+                unchanged, value, signature = self.gate.lookup(region, roi)
+            if unchanged:
+                self.count('gate_skips')
+                return value, None
+
+        pending = {'region': region, 'signature': signature, 'gray': None, 'key': None}
+        try:
+            with self.profiler.time('preprocess'):
+                gray = self.preprocess(roi)
+        except Exception:
+            return self.complete(pending, None), None
+        pending['gray'] = gray
+
+        if self.cache:
+            pending['key'] = self.cache.key(gray)
+            hit, value = self.cache.get(pending['key'])
+            if hit:
+                self.count('cache_hits')
+                return self.complete(pending, value, store=False), None
+
+        if self.predictor:
+            with self.predict_lock, self.profiler.time('predict'):
+                value, confidence = self.predictor.verify(region, gray)
+            if value is not None:
+                self.count('predict_hits')
+                if self.cache:
+                    self.cache.put(pending['key'], value, persist=False)
+                return self.complete(pending, value, store=False), None
+            if confidence is not None:
+                self.count('predict_misses')
+
+        if self.glyphs and self.glyphs.ready:
+            with self.glyph_lock, self.profiler.time('glyphs'):
+                value, confidence = self.glyphs.classify(gray)
+            if value is not None and confidence >= self.glyphs.min_confidence:
+                self.count('glyph_hits')
+                if self.cache:
+                    self.cache.put(pending['key'], value, persist=False)
+                return self.complete(pending, value, store=False), None
+            self.count('glyph_fallbacks')
+
+        return None, pending
+
+    def complete(self, pending, value, store=True):
+        """Record the result of a pending read (gate, templates, exemplars, cache) and return it"""
+        if store and pending['gray'] is not None:
+            if self.glyphs:
+                with self.glyph_lock:
+                    self.glyphs.learn(pending['gray'], value)
+            if self.cache:
+                self.cache.put(pending['key'], value)
+            if self.predictor:
+                with self.predict_lock:
+                    self.predictor.learn(pending['region'], pending['gray'], value)
+
+        if self.predictor:
+            with self.predict_lock:
+                self.predictor.observe(pending['region'], value)
+
+        if self.gate:
+            self.gate.store(pending['region'], pending['signature'], value)
+        return value
+
+    def read(self, frame, region):
+        """Extract the number shown in a frame region (None if unreadable)"""
+        value, pending = self.lookup(frame, region)
+        if pending is None:
+            return value
+
+        self.count('recognitions')
+        try:
+            value = self.recognize(pending['gray'])
+        except Exception:
+            value = None
+        return self.complete(pending, value)
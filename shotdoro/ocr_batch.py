@@ -0,0 +1,118 @@
+"""Batched OCR: many ROI crops tiled into one mosaic, one Tesseract call"""
+
+import bisect
+
+import cv2
+import numpy as np
+
+from .ocr import parse_number
+from .ocr_cache import content_key
+
+
+class MosaicBatcher:
+    """Recognizes pending reads of a DigitReader in a single image_to_data call
+
+    Every crop is binarized with the reader's leading cascade threshold, turned
+    into dark digits on white, scaled to `tile_height` and stacked one per text
+    line with blank separator rows. Words returned by Tesseract are mapped back
+    to their crop by the vertical center of their bounding box. Crops with
+    identical content are OCR'd once; crops that come back empty or non-numeric
+    are retried individually with the reader's full cascade.
+    """
+
+    def __init__(self, reader, tile_height=48, gap=32, margin=24, psm=6):
+        self.reader = reader
+        self.tile_height = tile_height
+        self.gap = gap
+        self.margin = margin
+        self.psm = psm
+
+        for key in ('batch_calls', 'batched_crops', 'batch_fallbacks'):
+            reader.stats.setdefault(key, 0)
+
+    def tile(self, gray):
+        """Binarized, dark-on-white crop scaled to the tile height"""
+        binary = self.reader.binarize(gray, self.reader.combos[0][0])
+
+        # Digits are the minority color; Tesseract wants them dark
+        if cv2.countNonZero(binary) < binary.size // 2:
+            binary = cv2.bitwise_not(binary)
+
+        width = max(1, int(round(binary.shape[1] * self.tile_height / binary.shape[0])))
+        return cv2.resize(binary, (width, self.tile_height), interpolation=cv2.INTER_AREA)
+
+    def build_mosaic(self, grays):
+        """Stack tiles vertically, returns (mosaic, top y of every row)"""
+        tiles = [self.tile(gray) for gray in grays]
+        width = max(tile.shape[1] for tile in tiles) + 2 * self.margin
+        height = self.margin * 2 + len(tiles) * self.tile_height + (len(tiles) - 1) * self.gap
+
+        mosaic = np.full((height, width), 255, np.uint8)
+        row_tops = []
+        y = self.margin
+        for tile in tiles:
+            mosaic[y:y + self.tile_height, self.margin:self.margin + tile.shape[1]] = tile
+            row_tops.append(y)
+            y += self.tile_height + self.gap
+
+        return mosaic, row_tops
+
+    def recognize(self, grays):
+        """One Tesseract call for all crops; None where a crop could not be mapped"""
+        mosaic, row_tops = self.build_mosaic(grays)
+
+        self.reader.count('ocr_calls')
+        self.reader.count('batch_calls')
+        with self.reader.profiler.time('tesseract_batch'):
+            words = self.reader.backend.image_to_data(mosaic, self.psm)
+
+        # Row of a word = last row starting above its vertical center (+ half a gap)
+        starts = [top - self.gap // 2 for top in row_tops]
+        rows = [[] for _ in grays]
+        for word in words:
+            center = word['top'] + word['height'] / 2
+            index = bisect.bisect_right(starts, center) - 1
+            if 0 <= index < len(rows):
+                rows[index].append((word['left'], word['text']))
+
+        values = []
+        for row in rows:
+            text = ''.join(text for _, text in sorted(row))
+            values.append(parse_number(text) if text.isdigit() else None)
+        return values
+
+    def resolve(self, pendings):
+        """Recognize pending reads and complete them on the reader, returns their values"""
+        if not pendings:
+            return []
+
+        # Deduplicate identical crops
+        groups = {}
+        for i, pending in enumerate(pendings):
+            key = pending['key'] or content_key(pending['gray'])
+            groups.setdefault(key, []).append(i)
+
+        members = list(groups.values())
+        grays = [pendings[group[0]]['gray'] for group in members]
+
+        try:
+            unique_values = self.recognize(grays)
+        except Exception:
+            unique_values = [None] * len(grays)
+        self.reader.count('batched_crops', len(grays))
+
+        values = [None] * len(pendings)
+        for group, value in zip(members, unique_values):
+            if value is None:
+                # Retry this crop alone with the full cascade
+                self.reader.count('batch_fallbacks')
+                self.reader.count('recognitions')
+                try:
+                    value = self.reader.recognize(pendings[group[0]]['gray'])
+                except Exception:
+                    value = None
+
+            for i in group:
+                values[i] = self.reader.complete(pendings[i], value, store=(i == group[0]))
+
+        return values
@@ -0,0 +1,112 @@
+"""Content-addressed OCR memo: preprocessed ROI bitmap hash -> recognized integer"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import cv2
+
+
+def default_cache_path():
+    """SQLite file in the per-user cache directory"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'ShotDORO', 'ocr_cache.sqlite')
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'shotdoro', 'ocr_cache.sqlite')
+
+
+def content_key(gray, namespace=b'', height=32):
+    """Hash of a crop resized to `height` rows (aspect kept) and Otsu-binarized"""
+    width = max(1, int(round(gray.shape[1] * height / gray.shape[0])))
+    small = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+    _, bitmap = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return hashlib.blake2b(namespace + bitmap.tobytes(), digest_size=16).hexdigest()
+
+
+class OcrCache:
+    """Bounded LRU of OCR results with an optional persistent SQLite store
+
+    Keys are content_key() hashes of the preprocessed crop, so the same glyphs
+    hit the cache across frames and across videos despite small compression
+    noise. Only integers are persisted; failed reads (None) are kept in memory
+    only, so a misconfigured run cannot poison the store.
+    """
+
+    COMMIT_EVERY = 64
+
+    def __init__(self, max_entries=4096, path=None, namespace='', height=32):
+        self.max_entries = max_entries
+        self.path = path
+        self.namespace = namespace.encode('utf-8')
+        self.height = height
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        self.pending = 0
+
+    def key(self, gray):
+        """Normalized content hash of a preprocessed (grayscale) crop"""
+        return content_key(gray, self.namespace, self.height)
+
+    def connect(self):
+        """Open the SQLite store on first use (from whichever thread runs the analysis)"""
+        if self.db is None and self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS ocr_cache (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        return self.db
+
+    def get(self, key):
+        """Return (hit, value)"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return True, self.entries[key]
+
+            db = self.connect()
+            if db is not None:
+                row = db.execute('SELECT value FROM ocr_cache WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self.remember(key, row[0])
+                    return True, row[0]
+
+        return False, None
+
+    def put(self, key, value, persist=True):
+        with self.lock:
+            self.remember(key, value)
+
+            db = self.connect() if persist else None
+            if db is not None and value is not None:
+                db.execute('INSERT OR REPLACE INTO ocr_cache (key, value) VALUES (?, ?)', (key, value))
+                self.pending += 1
+                if self.pending >= self.COMMIT_EVERY:
+                    db.commit()
+                    self.pending = 0
+
+    def remember(self, key, value):
+        """Insert into the in-memory LRU, evicting the oldest entry when full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def flush(self):
+        """Commit pending writes to the persistent store"""
+        with self.lock:
+            if self.db is not None and self.pending:
+                self.db.commit()
+                self.pending = 0
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
@@ -0,0 +1,163 @@
+"""Segment-parallel analysis: one worker process per time segment of the video"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pytesseract
+
+from .engine import AnalysisEngine, make_shot, probe_video
+from .ocr import DigitReader
+from .timing import Profiler, write_profile
+
+
+def split_segments(total_frames, count):
+    """Split [0, total_frames) into `count` contiguous (start, end) frame ranges"""
+    count = max(1, min(count, total_frames))
+    bounds = [total_frames * i // count for i in range(count + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(count)]
+
+
+def sum_stats(target, stats):
+    """Add numeric counters of `stats` into `target` (nested dicts are merged)"""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            sum_stats(target.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            target[key] = target.get(key, 0) + value
+    return target
+
+
+def run_segment(task):
+    """Worker entry point: analyze one segment and report its boundary readings"""
+    if task.get('tesseract_cmd'):
+        pytesseract.pytesseract.tesseract_cmd = task['tesseract_cmd']
+
+    engine = AnalysisEngine(
+        task['video_path'], task['current_ammo_region'], task['total_ammo_region'],
+        reader=DigitReader(**task['reader_options']),
+        **task['engine_options']
+    )
+    shots = engine.run(task['start_frame'], task['end_frame'])
+
+    return {
+        'start_frame': task['start_frame'],
+        'end_frame': task['end_frame'],
+        'shots': shots,
+        'first_reading': engine.detector.first_reading,
+        'last_reading': engine.detector.last_reading,
+        'fps': engine.detector.fps,
+        'summary': engine.summary,
+        'profile': engine.profiler.state() if engine.profile else None,
+    }
+
+
+def merge_segments(results):
+    """Stitch per-segment shots together in frame order
+
+    Each segment starts without a previous reading, so its first reading is
+    compared against the last reading of the segments before it. A drop across
+    the cut becomes exactly one shot, the same one a serial run would report.
+    """
+    shots = []
+    carry = None  # (frame, current, total) of the last reading so far
+
+    for result in sorted(results, key=lambda r: r['start_frame']):
+        first = result['first_reading']
+        if first is not None and carry is not None and first[1] < carry[1]:
+            frame_count, current_ammo, total_ammo = first
+            shots.append(make_shot(frame_count, result['fps'], current_ammo, carry[1], total_ammo))
+
+        shots.extend(result['shots'])
+
+        if result['last_reading'] is not None:
+            carry = result['last_reading']
+
+    return shots
+
+
+def build_tasks(video_path, current_ammo_region, total_ammo_region, segments, reader_options, engine_options):
+    """One task dict (picklable) per segment"""
+    return [{
+        'video_path': video_path,
+        'current_ammo_region': current_ammo_region,
+        'total_ammo_region': total_ammo_region,
+        'reader_options': reader_options or {},
+        'engine_options': engine_options,
+        'tesseract_cmd': pytesseract.pytesseract.tesseract_cmd,
+        'start_frame': start,
+        'end_frame': end,
+    } for start, end in segments]
+
+
+def analyze_parallel(video_path, current_ammo_region, total_ammo_region=None, skip_frames=1,
+                     workers=None, segments=None, reader_options=None, on_segment=None, **engine_options):
+    """Analyze a video split into time segments across worker processes
+
+    Returns (shots, summary). With a fixed stride, shots are identical to a serial
+    AnalysisEngine run as long as the backend seeks frame-accurately (OpenCV/FFmpeg
+    does). Adaptive sampling (max_skip_frames) is rejected with more than one
+    segment, as every segment would restart the stride on its own frame grid.
+    on_segment(done, total, result) is called as segments finish; extra keyword
+    arguments are passed on to every segment's AnalysisEngine. With profiling
+    the stage timings of all segments are merged into one report.
+    """
+    workers = workers or os.cpu_count() or 1
+    total_frames, fps = probe_video(video_path)
+    ranges = split_segments(total_frames, segments or workers)
+    # Every segment would restart the stride controller on its own frame grid
+    max_skip_frames = engine_options.get('max_skip_frames')
+    if len(ranges) > 1 and max_skip_frames and max_skip_frames > skip_frames:
+        raise ValueError("adaptive sampling (max_skip_frames) needs one serial run, not segments")
+    engine_options['skip_frames'] = skip_frames
+    profile_path = engine_options.pop('profile_path', None)
+    profile = engine_options.get('profile') or bool(profile_path)
+    engine_options['profile'] = profile
+    tasks = build_tasks(video_path, current_ammo_region, total_ammo_region, ranges,
+                        reader_options, engine_options)
+
+    start_time = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [pool.submit(run_segment, task) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_segment:
+                on_segment(len(results), len(tasks), result)
+
+    shots = merge_segments(results)
+    elapsed = time.time() - start_time
+
+    summary = {
+        'video': video_path,
+        'completed': all(r['summary']['completed'] for r in results),
+        'total_frames': total_frames,
+        'video_fps': fps,
+        'frames_decoded': 0,
+        'frames_analyzed': 0,
+        'frames_covered': 0,
+        'shots': len(shots),
+        'elapsed': elapsed,
+        'workers': min(workers, len(tasks)),
+        'segments': len(tasks),
+        'ocr': {},
+    }
+    for result in results:
+        summary['frames_decoded'] += result['summary']['frames_decoded']
+        summary['frames_analyzed'] += result['summary']['frames_analyzed']
+        summary['frames_covered'] += result['summary']['frames_covered']
+        sum_stats(summary['ocr'], result['summary']['ocr'])
+    summary['analysis_fps'] = summary['frames_covered'] / elapsed if elapsed > 0 else 0
+    summary['average_stride'] = (summary['frames_covered'] / summary['frames_analyzed']
+                                 if summary['frames_analyzed'] else 0)
+
+    if profile:
+        profiler = Profiler()
+        for result in results:
+            profiler.merge_state(result['profile'])
+        summary['profile'] = profiler.report(elapsed)
+        if profile_path:
+            write_profile(profile_path, summary['profile'])
+
+    return shots, summary
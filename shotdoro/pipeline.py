@@ -0,0 +1,233 @@
+"""Threaded analysis pipeline: decoder -> OCR workers -> in-order reducer"""
+
+import queue
+import threading
+import time
+
+from .frames import union_region
+
+_DONE = object()
+
+
+class StageClock:
+    """Busy time of one pipeline stage (summed over its threads)"""
+
+    def __init__(self, threads=1):
+        self.threads = threads
+        self.busy = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.busy += seconds
+
+    def utilization(self, elapsed):
+        return self.busy / (elapsed * self.threads) if elapsed > 0 else 0
+
+
+class DepthGauge:
+    """Average and peak fill of a bounded queue, sampled by the reducer"""
+
+    def __init__(self, q):
+        self.queue = q
+        self.samples = 0
+        self.total = 0
+        self.peak = 0
+
+    def sample(self):
+        depth = self.queue.qsize()
+        self.samples += 1
+        self.total += depth
+        self.peak = max(self.peak, depth)
+
+    def report(self):
+        return {
+            'capacity': self.queue.maxsize,
+            'average': self.total / self.samples if self.samples else 0,
+            'peak': self.peak,
+        }
+
+
+class Pipeline:
+    """Runs the scan of an AnalysisEngine as three stages connected by bounded queues
+
+    - decoder (1 thread): grabs skipped frames, reads analyzed ones and copies
+      the box around both regions out of the frame
+    - OCR workers (`threads` threads): reader.read() on the current ammo
+      region; the Tesseract calls release the GIL, so workers overlap with
+      each other and with decoding
+    - reducer (the thread calling run()): puts results back in frame order,
+      reads total ammo where it is due (engine.totals) and feeds
+      engine.emit() in that order
+
+    The decoder samples a fixed skip_frames stride; adaptive sampling is
+    rejected by the engine, as its stride depends on readings the reducer has
+    not emitted yet.
+
+    Full queues block the stage in front of them (backpressure); the summary
+    reports every stage's utilization and the average/peak queue depths.
+    """
+
+    def __init__(self, engine, threads=4, queue_size=None):
+        self.engine = engine
+        self.threads = max(1, int(threads))
+        self.queue_size = queue_size or 4 * self.threads
+
+        self.frames = queue.Queue(self.queue_size)
+        self.results = queue.Queue(self.queue_size)
+        self.gauges = {'frames': DepthGauge(self.frames), 'results': DepthGauge(self.results)}
+        self.clocks = {'decode': StageClock(), 'ocr': StageClock(self.threads), 'reduce': StageClock()}
+
+        self.error = None
+        self.decoded = 0
+
+    def put(self, q, item):
+        """Blocking put that gives up when the analysis was stopped"""
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if not self.engine.running or self.error:
+                    return False
+
+    def decode(self, source, start_frame, end_frame):
+        engine = self.engine
+        box = None
+        regions = None
+        frame_count = start_frame
+        sequence = 0
+        next_frame = engine.first_frame(start_frame)
+
+        try:
+            while engine.running and not self.error and (end_frame <= 0 or frame_count < end_frame):
+                started = time.perf_counter()
+                if frame_count + 1 < next_frame:
+                    ok = source.skip()
+                    self.clocks['decode'].add(time.perf_counter() - started)
+                    if not ok:
+                        break
+                    frame_count += 1
+                    continue
+
+                frame = source.read()
+                if frame is None:
+                    break
+                frame_count += 1
+
+                # Workers get a private copy of just the box around both regions
+                if box is None:
+                    box = union_region(engine.regions, frame.shape[1], frame.shape[0])
+                    regions = tuple(None if r is None else (r[0] - box[0], r[1] - box[1], r[2] - box[0], r[3] - box[1])
+                                    for r in engine.regions)
+                crop = frame[box[1]:box[3], box[0]:box[2]].copy()
+                self.clocks['decode'].add(time.perf_counter() - started)
+
+                if not self.put(self.frames, (sequence, frame_count, crop, regions)):
+                    break
+                sequence += 1
+                next_frame = frame_count + engine.skip_frames
+        except Exception as e:
+            self.error = e
+        finally:
+            self.decoded = frame_count - start_frame
+            for _ in range(self.threads):
+                self.frames.put(_DONE)
+
+    def work(self):
+        reader = self.engine.reader
+        try:
+            while True:
+                item = self.frames.get()
+                if item is _DONE:
+                    break
+                # After a stop or failure keep draining so the decoder can finish
+                if self.error or not self.engine.running:
+                    continue
+                sequence, frame_count, crop, (current_region, total_region) = item
+
+                started = time.perf_counter()
+                try:
+                    current_ammo = reader.read(crop, current_region)
+                except Exception as e:
+                    self.error = e
+                    continue
+                self.clocks['ocr'].add(time.perf_counter() - started)
+
+                # Total ammo depends on the previous reading, so the reducer reads it when due
+                self.put(self.results, (sequence, frame_count, current_ammo, crop, total_region))
+        finally:
+            self.results.put(_DONE)
+
+    def run(self, source, start_frame, end_frame, total_frames):
+        """Scan [start_frame, end_frame) through the pipeline, returns the frame counts"""
+        engine = self.engine
+        decoder = threading.Thread(target=self.decode, args=(source, start_frame, end_frame),
+                                   name='shotdoro-decode', daemon=True)
+        workers = [threading.Thread(target=self.work, name=f'shotdoro-ocr-{i}', daemon=True)
+                   for i in range(self.threads)]
+        decoder.start()
+        for worker in workers:
+            worker.start()
+
+        pending = {}
+        expected = 0
+        finished = 0
+        analyzed = 0
+        next_report = (start_frame // engine.progress_interval + 1) * engine.progress_interval
+
+        try:
+            while finished < self.threads:
+                for gauge in self.gauges.values():
+                    gauge.sample()
+                item = self.results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+
+                started = time.perf_counter()
+                pending[item[0]] = item[1:]
+                while expected in pending:
+                    frame_count, current_ammo, crop, total_region = pending.pop(expected)
+                    expected += 1
+                    analyzed += 1
+                    total_ammo = engine.totals.read(crop, total_region, current_ammo, engine.detector.previous_ammo)
+                    engine.emit(frame_count, current_ammo, total_ammo)
+
+                    if frame_count >= next_report:
+                        engine.report_progress(frame_count, start_frame, total_frames)
+                        next_report += engine.progress_interval * (
+                            (frame_count - next_report) // engine.progress_interval + 1)
+                self.clocks['reduce'].add(time.perf_counter() - started)
+        finally:
+            # Unblock the other stages if the reducer failed (e.g. in a callback)
+            if finished < self.threads:
+                self.error = self.error or RuntimeError("pipeline reducer stopped")
+                while finished < self.threads:
+                    try:
+                        if self.results.get(timeout=0.1) is _DONE:
+                            finished += 1
+                    except queue.Empty:
+                        pass
+            decoder.join()
+            for worker in workers:
+                worker.join()
+
+        if self.error:
+            raise self.error
+
+        frames_covered = self.decoded
+        return {
+            'frames_decoded': self.decoded,
+            'frames_analyzed': analyzed,
+            'frames_covered': frames_covered,
+            'average_stride': frames_covered / analyzed if analyzed else 0,
+        }
+
+    def report(self, elapsed):
+        """Stage utilization and queue depths for the run summary"""
+        return {
+            'ocr_threads': self.threads,
+            'utilization': {name: clock.utilization(elapsed) for name, clock in self.clocks.items()},
+            'queue_depth': {name: gauge.report() for name, gauge in self.gauges.items()},
+        }
@@ -0,0 +1,76 @@
+"""Prediction-verified reads: check a crop against the values the counter most likely shows next"""
+
+import cv2
+import numpy as np
+
+from .glyphs import binarize
+
+
+class ValuePredictor:
+    """Per-region exemplars of recognized values, checked against the likely next value
+
+    Between two analyzed frames an ammo counter almost always shows the same
+    value, one less (a shot) or a reload value. Every Tesseract reading stores
+    its crop (binarized, resized to `size`, zero-mean and unit-norm) as the
+    exemplar of that value for the region; values the counter rose to are kept
+    as reload values. verify() scores a new crop against the exemplars of the
+    previous value, previous - 1 and the reload values (one dot product each)
+    and accepts the best one at `min_confidence`; otherwise the caller runs the
+    full cascade.
+    """
+
+    def __init__(self, min_confidence=0.97, size=(48, 24), reload_values=3):
+        self.min_confidence = min_confidence
+        self.size = size
+        self.reload_values = reload_values
+        self.regions = {}  # region -> {'previous': value, 'exemplars': {value: vector}, 'reloads': [values]}
+
+    def state(self, region):
+        state = self.regions.get(region)
+        if state is None:
+            state = self.regions[region] = {'previous': None, 'exemplars': {}, 'reloads': []}
+        return state
+
+    def vectorize(self, gray):
+        """Zero-mean, unit-norm vector of the binarized crop"""
+        vector = cv2.resize(binarize(gray), self.size, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+        vector -= vector.mean()
+        return vector / max(float(np.linalg.norm(vector)), 1e-6)
+
+    def candidates(self, state):
+        """Previous value, one less and the reload values that have an exemplar"""
+        previous = state['previous']
+        values = [] if previous is None else [previous, previous - 1]
+        values += state['reloads']
+        return [value for value in dict.fromkeys(values) if value in state['exemplars']]
+
+    def verify(self, region, gray):
+        """(value, confidence) of the best candidate; value is None below min_confidence
+
+        confidence is None when no candidate has an exemplar yet (nothing was checked).
+        """
+        state = self.regions.get(region)
+        values = self.candidates(state) if state else None
+        if not values:
+            return None, None
+
+        scores = np.stack([state['exemplars'][value] for value in values]) @ self.vectorize(gray)
+        best = int(scores.argmax())
+        confidence = float(scores[best])
+        return (values[best] if confidence >= self.min_confidence else None), confidence
+
+    def observe(self, region, value):
+        """Track the last value of a region and the values it was reloaded to"""
+        if value is None:
+            return
+        state = self.state(region)
+        previous = state['previous']
+        if previous is not None and value > previous:
+            reloads = [value] + [reload for reload in state['reloads'] if reload != value]
+            state['reloads'] = reloads[:self.reload_values]
+        state['previous'] = value
+
+    def learn(self, region, gray, value):
+        """Make a crop Tesseract recognized the exemplar of its value"""
+        if value is not None:
+            self.state(region)['exemplars'][value] = self.vectorize(gray)
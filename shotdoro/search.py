@@ -0,0 +1,165 @@
+"""Sparse sampling of the ammo counter: change search by bisection and adaptive stride"""
+
+
+class RandomAccess:
+    """Frame-number access to a sequential source with a per-frame memo
+
+    Reading a frame a little ahead of the current position grabs forward instead
+    of seeking (a seek decodes from the previous keyframe anyway); larger or
+    backward jumps seek. `analyze(frame, frame_count)` is called once per frame
+    and its result memoized.
+    """
+
+    def __init__(self, source, analyze, max_gap=32):
+        self.source = source
+        self.analyze = analyze
+        self.max_gap = max_gap
+
+        self.position = 0  # 0-based index of the next frame the source returns
+        self.memo = {}
+        self.seeks = 0
+        self.decoded = 0
+
+    def start_at(self, frame_index):
+        self.source.seek(frame_index)
+        self.position = frame_index
+
+    def __call__(self, frame_count):
+        """Analysis result of 1-based frame `frame_count` (None past the end)"""
+        if frame_count in self.memo:
+            return self.memo[frame_count]
+
+        index = frame_count - 1
+        if not self.position <= index <= self.position + self.max_gap:
+            self.source.seek(index)
+            self.position = index
+            self.seeks += 1
+
+        result = None
+        while self.position < index:
+            if not self.source.skip():
+                break
+            self.position += 1
+            self.decoded += 1
+        else:
+            frame = self.source.read()
+            if frame is not None:
+                self.position += 1
+                self.decoded += 1
+                result = self.analyze(frame, frame_count)
+
+        self.memo[frame_count] = result
+        return result
+
+
+class ChangeSearch:
+    """Finds every frame where a reading changes, OCR'ing only samples and bisection probes
+
+    `read(frame_count)` returns the reading of a frame (None when unreadable).
+    Samples are taken every `stride` frames; wherever two consecutive valid
+    samples differ, the interval is bisected down to the first frame showing
+    each new value. An interval whose probe is unreadable is scanned frame by
+    frame, and so are the frames between the last unreadable sample and the
+    first valid one, so the first reading is the first readable frame after
+    them. Changes that return to the earlier value within one stride (A→B→A)
+    are not visible to the samples, so the stride should stay below the
+    shortest interval the counter can fire and be reloaded in; for the same
+    reason readings that come and go between two unreadable samples are missed.
+    """
+
+    def __init__(self, read, stride):
+        self.read = read
+        self.stride = max(2, int(stride))
+
+    def samples(self, first, last):
+        frame = first
+        while frame < last:
+            yield frame
+            frame += self.stride
+        yield last
+
+    def changes(self, first, last):
+        """Yield (frame, value) for the first valid reading and every change in [first, last]"""
+        previous = None
+        unreadable = None  # last unreadable sample before the first valid one
+        for frame in self.samples(first, last):
+            value = self.read(frame)
+            if value is None:
+                if previous is None:
+                    unreadable = frame
+                continue
+
+            if previous is None:
+                start = (frame, value) if unreadable is None else self.first_reading(unreadable, frame, value)
+                yield start
+                if start[1] != value:
+                    yield from self.bisect(start[0], start[1], frame, value)
+            elif value != previous[1]:
+                yield from self.bisect(previous[0], previous[1], frame, value)
+            previous = (frame, value)
+
+    def first_reading(self, a, b, value_b):
+        """First valid reading in (a, b] given an unreadable frame a and reading value_b at b"""
+        for frame in range(a + 1, b):
+            value = self.read(frame)
+            if value is not None:
+                return frame, value
+        return b, value_b
+
+    def bisect(self, a, value_a, b, value_b):
+        """Changes in (a, b] given reading value_a at a and value_b != value_a at b"""
+        if b - a <= 1:
+            yield b, value_b
+            return
+
+        middle = (a + b) // 2
+        value = self.read(middle)
+
+        if value is None:
+            yield from self.scan(a, value_a, b)
+        elif value == value_a:
+            yield from self.bisect(middle, value, b, value_b)
+        elif value == value_b:
+            yield from self.bisect(a, value_a, middle, value)
+        else:
+            yield from self.bisect(a, value_a, middle, value)
+            yield from self.bisect(middle, value, b, value_b)
+
+    def scan(self, a, value_a, b):
+        """Frame-by-frame fallback for an interval with unreadable frames"""
+        previous = value_a
+        for frame in range(a + 1, b + 1):
+            value = self.read(frame)
+            if value is not None and value != previous:
+                yield frame, value
+                previous = value
+
+
+class AdaptiveStride:
+    """Sampling stride that widens while the counter is stable and snaps back on a change
+
+    Every valid reading equal to the previous one multiplies the stride by
+    `growth` (capped at max_stride); a different reading drops it to
+    min_stride so the frames right after a shot are sampled densely.
+    Unreadable frames leave the stride unchanged.
+    """
+
+    def __init__(self, min_stride=1, max_stride=1, growth=2):
+        self.min_stride = max(1, int(min_stride))
+        self.max_stride = max(self.min_stride, int(max_stride))
+        self.growth = growth
+
+        self.stride = self.min_stride
+        self.previous = None
+
+    def update(self, value):
+        """Feed one reading, returns the stride to the next analyzed frame"""
+        if value is None:
+            return self.stride
+
+        if self.previous is not None and value != self.previous:
+            self.stride = self.min_stride
+        else:
+            self.stride = min(self.max_stride, int(self.stride * self.growth))
+        self.previous = value
+        return self.stride
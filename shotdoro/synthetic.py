@@ -0,0 +1,162 @@
+"""Synthetic HUD videos with a known ammo counter, for benchmarks and regression checks"""
+
+import random
+
+import cv2
+import numpy as np
+
+FONTS = {
+    'simplex': cv2.FONT_HERSHEY_SIMPLEX,
+    'duplex': cv2.FONT_HERSHEY_DUPLEX,
+    'complex': cv2.FONT_HERSHEY_COMPLEX,
+    'triplex': cv2.FONT_HERSHEY_TRIPLEX,
+    'plain': cv2.FONT_HERSHEY_PLAIN,
+}
+
+
+def ammo_script(frames, fps=30, magazine=30, magazines=4, fire_rate=10, burst=(3, 10),
+                pause=(0.5, 2.0), reload_time=2.0, tactical_reload=0.2, seed=0):
+    """Per-frame (current_ammo, total_ammo) of a scripted firefight
+
+    Bursts of `burst` shots at `fire_rate` shots/s are separated by random
+    pauses of `pause` seconds. An empty magazine is always reloaded; after a
+    burst the magazine is topped up early with probability `tactical_reload`
+    when below a third. A reload keeps the counter unchanged for
+    `reload_time` seconds, then refills it from the reserve (`total_ammo`),
+    which is restocked to `magazines` full magazines when it runs out.
+    """
+    rnd = random.Random(seed)
+    shot_interval = max(1, round(fps / fire_rate))
+    current = magazine
+    total = magazine * magazines
+    script = []
+
+    def hold(count):
+        script.extend([(current, total)] * max(0, min(count, frames - len(script))))
+
+    def reload():
+        nonlocal current, total
+        hold(round(reload_time * fps))
+        if total <= 0:
+            total = magazine * magazines
+        refill = min(magazine - current, total)
+        current += refill
+        total -= refill
+
+    while len(script) < frames:
+        hold(max(1, round(rnd.uniform(*pause) * fps)))
+        for _ in range(rnd.randint(*burst)):
+            if len(script) >= frames:
+                break
+            current -= 1
+            hold(shot_interval)
+            if current == 0:
+                break
+
+        if current == 0 or (current < magazine / 3 and rnd.random() < tactical_reload):
+            reload()
+
+    return script
+
+
+def shot_frames(script):
+    """Ground truth: (1-based frame, shots fired) wherever the counter drops"""
+    shots = []
+    for frame_count in range(2, len(script) + 1):
+        fired = script[frame_count - 2][0] - script[frame_count - 1][0]
+        if fired > 0:
+            shots.append((frame_count, fired))
+    return shots
+
+
+def hud_layout(width, height, font, digits):
+    """Text anchors and regions of the current and total counters (bottom right, scaled to the frame)"""
+    current_scale = height / 500
+    total_scale = current_scale * 0.6
+    current_thickness = max(1, round(height / 240))
+    total_thickness = max(1, round(height / 360))
+
+    (current_w, current_h), current_base = cv2.getTextSize('8' * digits, font, current_scale, current_thickness)
+    (total_w, total_h), total_base = cv2.getTextSize('8' * (digits + 1), font, total_scale, total_thickness)
+    pad = max(4, height // 90)
+
+    current_origin = (int(width * 0.80), int(height * 0.92))
+    total_origin = (current_origin[0] + current_w + 3 * pad, current_origin[1])
+
+    def region(origin, text_w, text_h, base):
+        return (origin[0] - pad, origin[1] - text_h - pad, origin[0] + text_w + pad, origin[1] + base + pad)
+
+    return {
+        'current': (current_origin, current_scale, current_thickness),
+        'total': (total_origin, total_scale, total_thickness),
+        'current_region': region(current_origin, current_w, current_h, current_base),
+        'total_region': region(total_origin, total_w, total_h, total_base),
+    }
+
+
+def render_hud_video(path, script, size=(1280, 720), fps=30, font='simplex', noise=6, quality=90,
+                     codec='MJPG', seed=0):
+    """Write `script` (per-frame (current, total) ammo) as a video, returns its regions
+
+    The background is a slowly scrolling gradient plus per-frame uniform noise
+    of amplitude `noise` gray levels; `quality` is the encoder quality
+    (0-100, honoured by MJPG).
+    """
+    width, height = size
+    face = FONTS[font]
+    digits = len(str(max(max(current, total) for current, total in script)))
+    layout = hud_layout(width, height, face, digits)
+
+    ramp = np.linspace(30, 110, 2 * width, dtype=np.float32)
+    background = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2).astype(np.uint8)
+    rnd = np.random.default_rng(seed)
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Cannot write video: {path} (codec {codec})")
+    writer.set(cv2.VIDEOWRITER_PROP_QUALITY, quality)
+
+    try:
+        for index, (current, total) in enumerate(script):
+            offset = (index * 2) % width
+            frame = np.ascontiguousarray(background[:, offset:offset + width])
+            for text, key, color in ((current, 'current', (235, 235, 235)), (total, 'total', (200, 200, 200))):
+                origin, scale, thickness = layout[key]
+                cv2.putText(frame, str(text), origin, face, scale, color, thickness, cv2.LINE_AA)
+            if noise:
+                frame = cv2.add(frame, rnd.integers(0, noise, frame.shape, dtype=np.uint8))
+            writer.write(frame)
+    finally:
+        writer.release()
+
+    return {'current_region': layout['current_region'], 'total_region': layout['total_region']}
+
+
+def synthetic_video(path, seconds=30, size=(1280, 720), fps=30, font='simplex', noise=6, quality=90,
+                    codec='MJPG', magazine=30, fire_rate=10, reload_time=2.0, seed=0):
+    """Render a scripted firefight to `path`, returns the scenario with its ground truth
+
+    The returned dict holds the rendering parameters, the HUD regions and
+    'shots': [(frame, shots_fired), ...] as the shot rule sees them when every
+    frame is analyzed.
+    """
+    frames = int(seconds * fps)
+    script = ammo_script(frames, fps, magazine=magazine, fire_rate=fire_rate, reload_time=reload_time, seed=seed)
+    regions = render_hud_video(path, script, size, fps, font, noise, quality, codec, seed)
+
+    return {
+        'video': path,
+        'frames': frames,
+        'fps': fps,
+        'size': list(size),
+        'font': font,
+        'noise': noise,
+        'quality': quality,
+        'codec': codec,
+        'magazine': magazine,
+        'fire_rate': fire_rate,
+        'reload_time': reload_time,
+        'seed': seed,
+        **regions,
+        'shots': shot_frames(script),
+    }
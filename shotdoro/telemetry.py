@@ -0,0 +1,390 @@
+"""Shot pings merged into telemetry CSV logs"""
+
+import codecs
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+SHOT_MARK = 'O'
+
+# Encodings tried in order when reading a telemetry CSV
+ENCODINGS = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr', 'latin1']
+
+# Rows per chunk in streaming mode
+CHUNK_ROWS = 200_000
+
+# Rows sampled when screening columns for the time axis
+SAMPLE_ROWS = 10_000
+
+# Bytes read to guess the encoding
+SNIFF_BYTES = 1 << 20
+
+# Parsed tables kept in memory, keyed by path and validated by (mtime, size)
+CACHED_TABLES = 2
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def column_values(series):
+    """Numeric column as float64 with NaN for missing values"""
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def varies(series):
+    """Same as series.nunique() > 1 for numeric columns, without hashing every value"""
+    values = column_values(series)
+    with np.errstate(invalid='ignore'):
+        return bool(np.nanmin(values) < np.nanmax(values)) if not np.isnan(values).all() else False
+
+
+def is_time_like_column(series):
+    """Helper function to determine if column is time-like
+
+    Numeric, not constant, non-negative and increasing between at least 80% of
+    consecutive rows (rows next to a missing value are not compared).
+    """
+    try:
+        if not pd.api.types.is_numeric_dtype(series):
+            return False
+        if pd.api.types.is_bool_dtype(series):
+            return False
+
+        values = column_values(series)
+        if np.isnan(values).all():
+            return False
+
+        # If all values are same, not a time column; values should be non-negative
+        low, high = np.nanmin(values), np.nanmax(values)
+        if not low < high or low < 0:
+            return False
+
+        # Check if mostly increasing pattern (time characteristic)
+        with np.errstate(invalid='ignore'):
+            diff = np.diff(values)
+        valid = ~np.isnan(diff)
+        if valid.any():
+            return (diff[valid] >= 0).sum() / valid.sum() > 0.8  # 80% or more increasing
+
+        return True
+
+    except Exception:
+        return False
+
+
+def sampled_time_like(df, columns, sample_rows=SAMPLE_ROWS):
+    """Columns that look time-like on a strided row sample, all evaluated at once
+
+    One (rows x columns) float matrix gives every column's range, sign and
+    share of increasing steps in a few NumPy reductions. A column rejected
+    here is never checked on the full data.
+    """
+    if not columns:
+        return set()
+
+    step = max(1, len(df) // sample_rows)
+    block = df[columns].iloc[::step].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    missing = np.isnan(block)
+    present = ~missing.all(axis=0)
+    low = np.where(missing, np.inf, block).min(axis=0)
+    high = np.where(missing, -np.inf, block).max(axis=0)
+
+    with np.errstate(invalid='ignore'):
+        diff = np.diff(block, axis=0)
+    valid = ~np.isnan(diff)
+    steps = valid.sum(axis=0)
+    increasing = ((diff >= 0) & valid).sum(axis=0)
+    monotonic = (steps == 0) | (increasing > 0.8 * np.maximum(steps, 1))
+
+    keep = present & (low < high) & (low >= 0) & monotonic
+    return {column for column, ok in zip(columns, keep) if ok}
+
+
+def find_time_column(df, sample_rows=SAMPLE_ROWS):
+    """Improved automatic time column detection - prioritize columns with changing values
+
+    Priority: an exact numeric 'time' column with changing values, then
+    time-like columns whose name contains 'time', then the 6th column, then any
+    time-like numeric column. Candidates are screened together on a row sample
+    (sampled_time_like) and only the first survivor in priority order is
+    confirmed on the full column.
+    """
+    # 1. Check 'time' column first (exact name)
+    if 'time' in df.columns:
+        col = 'time'
+        if pd.api.types.is_numeric_dtype(df[col]) and varies(df[col]):
+            return col
+
+    numeric = [col for col in df.columns
+               if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+    # 2. 'time' related column names, 3. column f (6th column), 4. any numeric column
+    candidates = [col for col in numeric if 'time' in str(col).lower()]
+    if len(df.columns) > 5 and df.columns[5] in numeric:
+        candidates.append(df.columns[5])
+    candidates += numeric
+
+    screened = sampled_time_like(df, numeric, sample_rows)
+    checked = set()
+    for col in candidates:
+        if col in checked or col not in screened:
+            continue
+        checked.add(col)
+        if is_time_like_column(df[col]):
+            return col
+
+    return None
+
+
+def match_shots(times, shot_times, tolerance):
+    """Rows within ±tolerance of any shot, found by one sort and two binary searches
+
+    Returns (mask, counts): a boolean mask over `times` marking every row that
+    matches at least one shot, and the number of rows matched by each shot (a
+    row near two shots counts for both). Same result as testing
+    `abs(times - shot) <= tolerance` for every shot; NaN times never match.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    shots = np.asarray(shot_times, dtype=np.float64)
+
+    valid = np.flatnonzero(~np.isnan(times))
+    order = valid[np.argsort(times[valid], kind='stable')]
+    ordered = times[order]
+    n = len(ordered)
+
+    lo = np.searchsorted(ordered, shots - tolerance, side='left')
+    hi = np.searchsorted(ordered, shots + tolerance, side='right')
+    if n:
+        lo, hi = fit_bounds(ordered, shots, tolerance, lo, hi)
+    counts = np.maximum(hi - lo, 0)
+
+    # Mark the union of the [lo, hi) ranges with a difference array
+    delta = np.zeros(n + 1, dtype=np.int64)
+    hit = counts > 0
+    np.add.at(delta, lo[hit], 1)
+    np.add.at(delta, hi[hit], -1)
+
+    mask = np.zeros(len(times), dtype=bool)
+    mask[order] = np.cumsum(delta[:-1]) > 0
+    return mask, counts
+
+
+def fit_bounds(ordered, shots, tolerance, lo, hi):
+    """Nudge the searchsorted bounds onto the exact abs(t - shot) <= tolerance test
+
+    `shot ± tolerance` is rounded before the search, so a bound can sit one
+    run of equal values off from where the exact test would put it.
+    """
+    n = len(ordered)
+
+    def matches(index):
+        return np.abs(ordered[np.clip(index, 0, n - 1)] - shots) <= tolerance
+
+    while True:
+        move = (lo > 0) & matches(lo - 1)
+        if not move.any():
+            break
+        lo = lo - move
+    while True:
+        move = (lo < hi) & ~matches(lo)
+        if not move.any():
+            break
+        lo = lo + move
+
+    while True:
+        move = (hi < n) & matches(hi)
+        if not move.any():
+            break
+        hi = hi + move
+    while True:
+        move = (hi > lo) & ~matches(hi - 1)
+        if not move.any():
+            break
+        hi = hi - move
+
+    return lo, hi
+
+
+def sniff_encoding(path, sample_bytes=SNIFF_BYTES):
+    """First of ENCODINGS that decodes a byte sample from the start of the file"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ENCODINGS[1:]:
+        try:
+            # Incremental decode: a character cut off at the end of the sample is not an error
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return ENCODINGS[-1]
+
+
+def parse_csv(path, encoding=None, **read_options):
+    """pd.read_csv with the sniffed encoding, returns (result, encoding)
+
+    Bytes past the sniffed sample can still fail to decode; the next encodings
+    of ENCODINGS are then tried in order.
+    """
+    encoding = encoding or sniff_encoding(path)
+    for candidate in ENCODINGS[ENCODINGS.index(encoding):]:
+        try:
+            return pd.read_csv(path, encoding=candidate, **read_options), candidate
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    raise ValueError(f"Cannot decode CSV file: {path}")
+
+
+def read_csv_head(path, rows=CHUNK_ROWS):
+    """First rows of a CSV, returns (df, encoding)"""
+    return parse_csv(path, nrows=rows)
+
+
+def sidecar_path(path):
+    return path + '.shotdoro.parquet'
+
+
+def read_sidecar(path, signature):
+    """(df, time_column, encoding) from a Parquet sidecar written for this file version, else None"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    sidecar = sidecar_path(path)
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        table = pq.read_table(sidecar)
+        info = json.loads(table.schema.metadata[b'shotdoro'])
+    except Exception:
+        return None
+    if [info['mtime_ns'], info['size']] != list(signature):
+        return None
+    return table.to_pandas(), info['time_column'], info['encoding']
+
+
+def write_sidecar(path, signature, loaded):
+    """Store a parsed table next to its CSV (best effort: needs pyarrow, skipped on failure)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+
+    df, time_column, encoding = loaded
+    info = {'mtime_ns': signature[0], 'size': signature[1], 'time_column': time_column, 'encoding': encoding}
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'shotdoro'] = json.dumps(info).encode('utf-8')
+        pq.write_table(table.replace_schema_metadata(metadata), sidecar_path(path))
+    except Exception:
+        return False
+    return True
+
+
+def load_telemetry(path, sidecar=False):
+    """Parsed telemetry CSV and its time column, parsed at most once per file version
+
+    Returns (df, time_column, encoding); time_column is None when none was
+    found. Results are cached in memory keyed by path and validated by the
+    file's mtime and size, so the loader and the merge share one parse. With
+    sidecar=True the parsed table is also stored as <csv>.shotdoro.parquet
+    (requires pyarrow) and reloaded from there in later sessions. The returned
+    DataFrame is shared: do not modify it in place.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _tables_lock:
+        cached = _tables.get(key)
+        if cached and cached[0] == signature:
+            _tables.move_to_end(key)
+            return cached[1]
+
+    loaded = read_sidecar(path, signature) if sidecar else None
+    if loaded is None:
+        df, encoding = parse_csv(path)
+        loaded = (df, find_time_column(df), encoding)
+        if sidecar:
+            write_sidecar(path, signature, loaded)
+
+    with _tables_lock:
+        _tables[key] = (signature, loaded)
+        _tables.move_to_end(key)
+        while len(_tables) > CACHED_TABLES:
+            _tables.popitem(last=False)
+    return loaded
+
+
+def add_shot_column_streaming(path, output_path, shot_times, tolerance, time_column=None,
+                              chunk_rows=CHUNK_ROWS, on_chunk=None):
+    """Copy a CSV to output_path with a shot_time column, one chunk at a time
+
+    Memory stays bounded by `chunk_rows` whatever the file size. Shot times are
+    sorted once; each chunk is matched only against the shots that fall inside
+    its time span (± tolerance), located by binary search, so a time-ordered
+    log advances a cursor through the shot list. Markers and per-shot counts
+    are the same as match_shots() over the whole file. Cells are read and
+    written as text, so the other columns are copied unchanged (no per-chunk
+    type inference); only the time column is parsed as numbers for matching.
+    on_chunk(rows_done) is called after every chunk.
+
+    Returns a dict with rows, matched (sum of per-shot counts), counts (in the
+    original shot order), time_column and encoding.
+    """
+    head, encoding = read_csv_head(path, min(chunk_rows, 10_000))
+    time_column = time_column or find_time_column(head)
+    if time_column is None:
+        raise ValueError("Cannot find time column.")
+
+    # The head may decode with an encoding that fails further down the file
+    for encoding in ENCODINGS[ENCODINGS.index(encoding):]:
+        try:
+            result = stream_shot_column(path, output_path, encoding, shot_times, tolerance,
+                                        time_column, chunk_rows, on_chunk)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        result.update(time_column=time_column, encoding=encoding)
+        return result
+    raise ValueError(f"Cannot decode CSV file: {path}")
+
+
+def stream_shot_column(path, output_path, encoding, shot_times, tolerance, time_column, chunk_rows, on_chunk):
+    shot_times = np.asarray(shot_times, dtype=np.float64)
+    order = np.argsort(shot_times, kind='stable')
+    sorted_shots = shot_times[order]
+    counts = np.zeros(len(shot_times), dtype=np.int64)
+
+    # Window bounds are widened slightly; shots that do not match just count 0
+    margin = abs(tolerance) * 1e-9 + 1e-9
+
+    rows = 0
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as output:
+        for chunk in pd.read_csv(path, encoding=encoding, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+            times = pd.to_numeric(chunk[time_column], errors='coerce').to_numpy(dtype=np.float64)
+
+            mask = np.zeros(len(chunk), dtype=bool)
+            if len(times) and not np.isnan(times).all():
+                first = np.searchsorted(sorted_shots, np.nanmin(times) - tolerance - margin, side='left')
+                last = np.searchsorted(sorted_shots, np.nanmax(times) + tolerance + margin, side='right')
+                if last > first:
+                    mask, chunk_counts = match_shots(times, sorted_shots[first:last], tolerance)
+                    counts[order[first:last]] += chunk_counts
+
+            chunk['shot_time'] = np.where(mask, SHOT_MARK, '')
+            chunk.to_csv(output, header=(rows == 0), index=False)
+            rows += len(chunk)
+            if on_chunk:
+                on_chunk(rows)
+
+    return {'rows': rows, 'matched': int(counts.sum()), 'counts': counts}
@@ -0,0 +1,269 @@
+"""OCR backends: per-call pytesseract subprocess or long-lived in-process Tesseract engines"""
+
+import atexit
+import ctypes
+import ctypes.util
+import glob
+import os
+import queue
+import threading
+import warnings
+
+import numpy as np
+import pytesseract
+
+
+DIGITS = '0123456789'
+
+
+def tesseract_config(psm):
+    """Digit-only Tesseract config for a page segmentation mode"""
+    return f'--oem 3 --psm {psm} -c tessedit_char_whitelist={DIGITS}'
+
+
+class PytesseractBackend:
+    """Spawns the tesseract executable for every call (original behavior)"""
+
+    name = 'pytesseract'
+
+    def image_to_string(self, image, psm):
+        return pytesseract.image_to_string(image, config=tesseract_config(psm))
+
+    def image_to_data(self, image, psm):
+        data = pytesseract.image_to_data(image, config=tesseract_config(psm), output_type=pytesseract.Output.DICT)
+        return [
+            {'left': data['left'][i], 'top': data['top'][i], 'width': data['width'][i],
+             'height': data['height'][i], 'conf': float(data['conf'][i]), 'text': data['text'][i].strip()}
+            for i in range(len(data['text']))
+            if int(data['level'][i]) == 5 and data['text'][i].strip()
+        ]
+
+
+def parse_tsv(tsv):
+    """Word boxes from Tesseract TSV output (same shape as PytesseractBackend.image_to_data)"""
+    words = []
+    for line in tsv.splitlines():
+        fields = line.split('\t')
+        if len(fields) < 12 or fields[0] != '5' or not fields[11].strip():
+            continue
+        words.append({
+            'left': int(fields[6]), 'top': int(fields[7]), 'width': int(fields[8]),
+            'height': int(fields[9]), 'conf': float(fields[10]), 'text': fields[11].strip(),
+        })
+    return words
+
+
+def find_tesseract_library():
+    """Locate libtesseract (next to tesseract_cmd on Windows, system paths elsewhere)"""
+    candidates = []
+
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if cmd and os.path.dirname(cmd):
+        install_dir = os.path.dirname(cmd)
+        candidates += sorted(glob.glob(os.path.join(install_dir, 'libtesseract*.dll')), reverse=True)
+        candidates += sorted(glob.glob(os.path.join(install_dir, 'libtesseract*.so*')), reverse=True)
+
+    found = ctypes.util.find_library('tesseract')
+    if found:
+        candidates.append(found)
+    candidates += ['libtesseract.so.5', 'libtesseract.so.4', 'libtesseract.dylib']
+
+    for candidate in candidates:
+        try:
+            return ctypes.CDLL(candidate)
+        except OSError:
+            continue
+    raise OSError("libtesseract not found (install Tesseract or use the pytesseract backend)")
+
+
+def default_tessdata():
+    """tessdata directory next to a configured tesseract.exe, else Tesseract's own default"""
+    if os.environ.get('TESSDATA_PREFIX'):
+        return None
+
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if cmd and os.path.dirname(cmd):
+        tessdata = os.path.join(os.path.dirname(cmd), 'tessdata')
+        if os.path.isdir(tessdata):
+            return tessdata
+    return None
+
+
+class TesseractEngine:
+    """One TessBaseAPI handle with the digit whitelist and model loaded once"""
+
+    def __init__(self, lib, datapath=None, language='eng'):
+        self.lib = lib
+        self.handle = lib.TessBaseAPICreate()
+
+        datapath = datapath.encode('utf-8') if datapath else None
+        if lib.TessBaseAPIInit3(self.handle, datapath, language.encode('utf-8')) != 0:
+            lib.TessBaseAPIDelete(self.handle)
+            self.handle = None
+            raise OSError(f"Tesseract could not load language '{language}'")
+
+        lib.TessBaseAPISetVariable(self.handle, b'tessedit_char_whitelist', DIGITS.encode('ascii'))
+        self.psm = None
+
+    def set_image(self, image, psm):
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        if image.ndim != 2:
+            raise ValueError("Tesseract engine expects a single-channel image")
+
+        if psm != self.psm:
+            self.lib.TessBaseAPISetPageSegMode(self.handle, psm)
+            self.psm = psm
+
+        height, width = image.shape
+        self.lib.TessBaseAPISetImage(self.handle, image.ctypes.data_as(ctypes.c_void_p),
+                                     width, height, 1, image.strides[0])
+        self.lib.TessBaseAPISetSourceResolution(self.handle, 70)
+
+    def take_text(self, text_ptr):
+        """Copy and free a char* returned by the API"""
+        if not text_ptr:
+            return ''
+        try:
+            return ctypes.string_at(text_ptr).decode('utf-8', errors='replace')
+        finally:
+            self.lib.TessDeleteText(text_ptr)
+
+    def image_to_string(self, image, psm):
+        self.set_image(image, psm)
+        return self.take_text(self.lib.TessBaseAPIGetUTF8Text(self.handle))
+
+    def image_to_data(self, image, psm):
+        self.set_image(image, psm)
+        return parse_tsv(self.take_text(self.lib.TessBaseAPIGetTsvText(self.handle, 0)))
+
+    def close(self):
+        if self.handle:
+            self.lib.TessBaseAPIEnd(self.handle)
+            self.lib.TessBaseAPIDelete(self.handle)
+            self.handle = None
+
+
+def declare_api(lib):
+    """ctypes signatures of the C API functions we use"""
+    handle = ctypes.c_void_p
+    lib.TessBaseAPICreate.restype = handle
+    lib.TessBaseAPICreate.argtypes = []
+    lib.TessBaseAPIInit3.restype = ctypes.c_int
+    lib.TessBaseAPIInit3.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetVariable.restype = ctypes.c_int
+    lib.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetPageSegMode.restype = None
+    lib.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPISetImage.restype = None
+    lib.TessBaseAPISetImage.argtypes = [handle, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                        ctypes.c_int, ctypes.c_int]
+    lib.TessBaseAPISetSourceResolution.restype = None
+    lib.TessBaseAPISetSourceResolution.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+    lib.TessBaseAPIGetUTF8Text.argtypes = [handle]
+    lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+    lib.TessBaseAPIGetTsvText.argtypes = [handle, ctypes.c_int]
+    lib.TessDeleteText.restype = None
+    lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+    lib.TessBaseAPIEnd.restype = None
+    lib.TessBaseAPIEnd.argtypes = [handle]
+    lib.TessBaseAPIDelete.restype = None
+    lib.TessBaseAPIDelete.argtypes = [handle]
+    return lib
+
+
+class EnginePoolBackend:
+    """Long-lived Tesseract engines fed images in memory, one per concurrent worker
+
+    Engines are created on demand and returned to the pool after each call, so a
+    single-threaded analysis keeps exactly one engine while a threaded pipeline
+    grows one per OCR thread. No process spawn or temp file per call.
+    """
+
+    name = 'capi'
+
+    def __init__(self, datapath=None, language='eng'):
+        self.lib = declare_api(find_tesseract_library())
+        self.datapath = datapath or default_tessdata()
+        self.language = language
+
+        self.idle = queue.LifoQueue()
+        self.engines = []
+        self.lock = threading.Lock()
+
+        # Fail early if the model cannot be loaded
+        self.idle.put(self.create_engine())
+
+    def create_engine(self):
+        engine = TesseractEngine(self.lib, self.datapath, self.language)
+        with self.lock:
+            self.engines.append(engine)
+        return engine
+
+    def call(self, method, image, psm):
+        """Run one engine method on a pooled engine"""
+        try:
+            engine = self.idle.get_nowait()
+        except queue.Empty:
+            engine = self.create_engine()
+
+        try:
+            return getattr(engine, method)(image, psm)
+        finally:
+            self.idle.put(engine)
+
+    def image_to_string(self, image, psm):
+        return self.call('image_to_string', image, psm)
+
+    def image_to_data(self, image, psm):
+        return self.call('image_to_data', image, psm)
+
+    @property
+    def size(self):
+        return len(self.engines)
+
+    def close(self):
+        with self.lock:
+            for engine in self.engines:
+                engine.close()
+            self.engines = []
+        self.idle = queue.LifoQueue()
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def create_backend(name):
+    if name == 'pytesseract':
+        return PytesseractBackend()
+    if name == 'capi':
+        try:
+            return EnginePoolBackend()
+        except (OSError, AttributeError) as e:
+            warnings.warn(f"Tesseract C API unavailable ({e}); using pytesseract", RuntimeWarning)
+            return PytesseractBackend()
+    raise ValueError(f"Unknown OCR backend: {name}")
+
+
+def get_backend(name='pytesseract'):
+    """Backend instance shared by all readers of this process
+
+    'capi' falls back to 'pytesseract' when libtesseract cannot be loaded.
+    Keyed by pid so forked workers never reuse the parent's engine handles.
+    """
+    key = (name, os.getpid())
+    with _shared_lock:
+        backend = _shared.get(key)
+        if backend is None:
+            backend = _shared[key] = create_backend(name)
+        return backend
+
+
+@atexit.register
+def close_backends():
+    for (name, pid), backend in list(_shared.items()):
+        if pid != os.getpid():
+            continue
+        if hasattr(backend, 'close'):
+            backend.close()
@@ -0,0 +1,219 @@
+"""Per-stage timing of the analysis hot path (decode, preprocessing, Tesseract, detection)"""
+
+import json
+import math
+import threading
+import time
+
+# Latency histogram buckets grow by 5%, so percentiles are within ~2.5% of the exact value
+BUCKET_GROWTH = 1.05
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+_MIN_SECONDS = 1e-7
+
+# Stages summed to tell decode-bound from OCR-bound runs
+STAGE_GROUPS = {
+    'decode': ('seek', 'grab', 'decode'),
+    'ocr': ('gate', 'preprocess', 'predict', 'glyphs', 'threshold', 'tesseract', 'tesseract_batch'),
+    'detect': ('detect',),
+}
+
+
+class StageStats:
+    """Count, total, max and a log-bucketed latency histogram of one stage"""
+
+    def __init__(self, count=0, total=0.0, longest=0.0, buckets=None):
+        self.count = count
+        self.total = total
+        self.max = longest
+        self.buckets = dict(buckets or {})
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        # floor, not int(): sub-second logs are negative and must not round up a bucket
+        bucket = math.floor(math.log(max(seconds, _MIN_SECONDS)) / _LOG_GROWTH)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def percentile(self, q):
+        """Approximate q-quantile (0..1) in seconds"""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.max, BUCKET_GROWTH ** (bucket + 0.5))
+        return self.max
+
+    def state(self):
+        return (self.count, self.total, self.max, self.buckets)
+
+    def report(self, elapsed=None):
+        report = {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_ms': 1000 * self.total / self.count if self.count else 0,
+            'p50_ms': 1000 * self.percentile(0.50),
+            'p95_ms': 1000 * self.percentile(0.95),
+            'p99_ms': 1000 * self.percentile(0.99),
+            'max_ms': 1000 * self.max,
+        }
+        if elapsed:
+            report['share'] = self.total / elapsed
+        return report
+
+
+class _Timer:
+    __slots__ = ('profiler', 'stage', 'started')
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullProfiler:
+    """Disabled profiler: time() hands out one shared no-op context manager"""
+
+    enabled = False
+
+    def time(self, stage):
+        return _NULL_TIMER
+
+    def add(self, stage, seconds):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """Collects per-stage latencies from any number of threads
+
+    Usage on the hot path: `with profiler.time('decode'): frame = source.read()`.
+    Every thread records into its own table (no locking per sample); tables are
+    merged when the report is built. Profilers of other processes are merged
+    through state() / merge_state().
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.tables = []
+
+    def table(self):
+        """This thread's {stage: StageStats}"""
+        try:
+            return self.local.stages
+        except AttributeError:
+            stages = self.local.stages = {}
+            with self.lock:
+                self.tables.append(stages)
+            return stages
+
+    def time(self, stage):
+        return _Timer(self, stage)
+
+    def add(self, stage, seconds):
+        stages = self.table()
+        stats = stages.get(stage)
+        if stats is None:
+            stats = stages[stage] = StageStats()
+        stats.add(seconds)
+
+    def merged(self):
+        """{stage: StageStats} over all threads"""
+        merged = {}
+        with self.lock:
+            tables = list(self.tables)
+        for stages in tables:
+            for stage, stats in list(stages.items()):
+                merged.setdefault(stage, StageStats()).merge(stats)
+        return merged
+
+    def state(self):
+        """Picklable snapshot for merge_state() in another process"""
+        return {stage: stats.state() for stage, stats in self.merged().items()}
+
+    def merge_state(self, state):
+        stages = self.table()
+        for stage, values in state.items():
+            stages.setdefault(stage, StageStats()).merge(StageStats(*values))
+
+    def report(self, elapsed=None):
+        """Per-stage count/total/p50/p95/p99 plus decode/OCR/detect totals and the dominant group
+
+        Stage totals of concurrent threads add up, so they can exceed `elapsed`.
+        """
+        merged = self.merged()
+        stages = {stage: merged[stage].report(elapsed) for stage in sorted(merged)}
+        groups = {group: sum(merged[stage].total for stage in members if stage in merged)
+                  for group, members in STAGE_GROUPS.items()}
+
+        return {
+            'elapsed': elapsed,
+            'stages': stages,
+            'groups_s': groups,
+            'bound': max(groups, key=groups.get) if any(groups.values()) else None,
+        }
+
+
+def write_profile(path, report):
+    """Dump a profile report as JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+class TimedSource:
+    """Frame source wrapper recording seek/grab/decode latencies"""
+
+    def __init__(self, source, profiler):
+        self.source = source
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+    def seek(self, frame_index):
+        with self.profiler.time('seek'):
+            return self.source.seek(frame_index)
+
+    def skip(self):
+        with self.profiler.time('grab'):
+            return self.source.skip()
+
+    def read(self):
+        with self.profiler.time('decode'):
+            return self.source.read()
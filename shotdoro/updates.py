@@ -0,0 +1,48 @@
+"""Worker-to-GUI update channel: coalesced state plus ordered events, drained by the GUI thread"""
+
+from collections import deque
+
+
+class UpdateChannel:
+    """Hands analysis updates from a worker thread to the GUI thread
+
+    The worker never touches the GUI and never waits on it:
+      post(kind, *args) - state; only the latest arguments of each kind are kept
+                          (progress, current ammo reading)
+      send(kind, *args) - events that must all arrive, in order (shots, log lines)
+    The GUI thread calls drain() on a fixed cadence (e.g. every 100 ms) and
+    applies what it returns: all events in order, then the latest state of
+    each posted kind. Both containers are safe for one producer and one
+    consumer without locks (deque appends/pops and dict item assignment are
+    atomic), so analysis speed does not depend on how often the GUI redraws.
+    """
+
+    def __init__(self):
+        self.events = deque()
+        self.latest = {}
+
+        # Number of state updates replaced before the GUI saw them
+        self.coalesced = 0
+
+    def post(self, kind, *args):
+        if kind in self.latest:
+            self.coalesced += 1
+        self.latest[kind] = args
+
+    def send(self, kind, *args):
+        self.events.append((kind, args))
+
+    def drain(self):
+        """[(kind, args), ...] since the last drain: events in order, then latest states"""
+        updates = []
+        while True:
+            try:
+                updates.append(self.events.popleft())
+            except IndexError:
+                break
+
+        for kind in list(self.latest):
+            args = self.latest.pop(kind, None)
+            if args is not None:
+                updates.append((kind, args))
+        return updates
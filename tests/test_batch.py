@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+
+from shotdoro.batch import plan_segments, run_batch
+
+
+def write_clip(path, frames):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for _ in range(frames):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+
+def test_plan_segments_never_exceeds_frames():
+    assert plan_segments([3, 2], 16) == [3, 2]
+    assert plan_segments([1000, 10], 4) == [4, 1]
+
+
+def test_short_videos_with_many_workers_complete(tmp_path):
+    videos = [tmp_path / 'three.avi', tmp_path / 'two.avi']
+    for path, frames in zip(videos, [3, 2]):
+        write_clip(path, frames)
+    reported = []
+
+    jobs, summary = run_batch([str(path) for path in videos], (0, 0, 32, 24), workers=16,
+                              output_dir=str(tmp_path / 'out'), on_job=lambda job, done, total: reported.append(done))
+
+    assert [job['frames'] for job in jobs] == [3, 2]
+    assert [job['segments'] for job in jobs] == [3, 2]
+    assert all(job['status'] != 'pending' for job in jobs)
+    assert sorted(reported) == [1, 2]
+    assert (tmp_path / 'out' / 'batch_index.csv').exists()
@@ -0,0 +1,57 @@
+import shutil
+
+import pytest
+import pytesseract
+
+from shotdoro.engine import AnalysisEngine
+from shotdoro.ocr import DigitReader
+from shotdoro.parallel import analyze_parallel
+from shotdoro.synthetic import synthetic_video
+from shotdoro.tesseract_api import EnginePoolBackend
+
+
+def available_backend():
+    """In-process Tesseract if libtesseract loads, else the executable if it is on PATH"""
+    try:
+        EnginePoolBackend().close()
+        return 'capi'
+    except (OSError, AttributeError):
+        pass
+    if shutil.which(pytesseract.pytesseract.tesseract_cmd):
+        return 'pytesseract'
+    return None
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    backend = available_backend()
+    if backend is None:
+        pytest.skip("no Tesseract backend available")
+    path = str(tmp_path_factory.mktemp('clips') / 'hud.avi')
+    scenario = synthetic_video(path, seconds=6, size=(640, 360), seed=3)
+    return scenario, backend
+
+
+def serial_shots(scenario, backend, **options):
+    engine = AnalysisEngine(scenario['video'], scenario['current_region'], scenario['total_region'],
+                            reader=DigitReader(backend=backend), **options)
+    return engine.run()
+
+
+@pytest.mark.parametrize('lazy_total', [True, False])
+def test_segments_match_serial_scan(clip, lazy_total):
+    scenario, backend = clip
+    expected = serial_shots(scenario, backend, lazy_total=lazy_total)
+
+    shots, summary = analyze_parallel(scenario['video'], scenario['current_region'], scenario['total_region'],
+                                      workers=2, segments=3, reader_options={'backend': backend},
+                                      lazy_total=lazy_total)
+
+    assert expected
+    assert shots == expected
+    assert summary['segments'] == 3
+
+
+def test_lazy_total_matches_eager(clip):
+    scenario, backend = clip
+    assert serial_shots(scenario, backend) == serial_shots(scenario, backend, lazy_total=False)
@@ -0,0 +1,35 @@
+from shotdoro.search import ChangeSearch
+
+
+def reader(values):
+    """read(frame) over a {frame: value} map (missing frames are unreadable)"""
+    return lambda frame: values.get(frame)
+
+
+def serial_changes(read, first, last):
+    """What a frame-by-frame scan reports: the first reading and every change"""
+    changes = []
+    for frame in range(first, last + 1):
+        value = read(frame)
+        if value is not None and (not changes or value != changes[-1][1]):
+            changes.append((frame, value))
+    return changes
+
+
+def test_changes_match_serial_scan():
+    values = {frame: 30 - (frame >= 7) - (frame >= 23) - 2 * (frame >= 40) for frame in range(1, 61)}
+    read = reader(values)
+    assert list(ChangeSearch(read, 15).changes(1, 60)) == serial_changes(read, 1, 60)
+
+
+def test_unreadable_first_sample():
+    values = {frame: 30 if frame < 10 else 29 for frame in range(2, 41)}
+    read = reader(values)
+    assert list(ChangeSearch(read, 15).changes(1, 40)) == [(2, 30), (10, 29)]
+    assert list(ChangeSearch(read, 15).changes(1, 40)) == serial_changes(read, 1, 40)
+
+
+def test_several_unreadable_samples():
+    values = {frame: 30 if frame < 25 else 29 for frame in range(20, 61)}
+    read = reader(values)
+    assert list(ChangeSearch(read, 8).changes(1, 60)) == [(20, 30), (25, 29)]
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from shotdoro.telemetry import add_shot_column_streaming, find_time_column, match_shots
+
+LOG = """a,time,c,d
+1,0.0,x,NA
+2,0.1,,7
+,0.2,y,
+4,,z,8
+5,0.4,007,1e3
+"""
+
+
+def loop_match(times, shot_times, tolerance):
+    """Per-shot scan over every row, as the GUI matched shots before match_shots"""
+    times = pd.Series(times)
+    mask = np.zeros(len(times), dtype=bool)
+    counts = []
+    for shot_time in shot_times:
+        matching_rows = abs(times - shot_time) <= tolerance
+        mask |= matching_rows.to_numpy()
+        counts.append(int(matching_rows.sum()))
+    return mask, counts
+
+
+def full_scan_time_like(series):
+    if not pd.api.types.is_numeric_dtype(series) or series.nunique() <= 1:
+        return False
+    if series.min() < 0:
+        return False
+    diff = series.diff().dropna()
+    return len(diff) == 0 or (diff >= 0).sum() / len(diff) > 0.8
+
+
+def full_scan_time_column(df):
+    """Time column detection checking every candidate on the whole column (before sampling)"""
+    if 'time' in df.columns and pd.api.types.is_numeric_dtype(df['time']) and df['time'].nunique() > 1:
+        return 'time'
+    candidates = [col for col in df.columns if 'time' in str(col).lower()]
+    if len(df.columns) > 5:
+        candidates.append(df.columns[5])
+    candidates += list(df.columns)
+    for col in candidates:
+        if full_scan_time_like(df[col]):
+            return col
+    return None
+
+
+def random_column(rng, rows):
+    kind = rng.integers(6)
+    if kind == 0:
+        values = np.cumsum(rng.uniform(0, 0.1, rows))  # clock
+    elif kind == 1:
+        values = rng.normal(50, 10, rows)  # noise
+    elif kind == 2:
+        values = np.full(rows, 3.0)  # constant
+    elif kind == 3:
+        values = np.cumsum(rng.uniform(0, 1, rows)) - rows  # increasing through negative values
+    elif kind == 4:
+        values = np.cumsum(rng.uniform(0, 0.1, rows))  # clock with gaps
+        values[rng.random(rows) < 0.2] = np.nan
+    else:
+        return rng.choice(['a', 'b', 'c'], rows)
+    return values
+
+
+def test_match_shots_matches_loop():
+    rng = np.random.default_rng(14)
+    for _ in range(300):
+        rows = int(rng.integers(0, 200))
+        # Coarse grid: many rows sit exactly on or next to a tolerance boundary
+        times = np.round(rng.uniform(0, 10, rows) * 60) / 60
+        times[rng.random(rows) < 0.05] = np.nan
+        if rng.random() < 0.5:
+            times.sort()
+        shots = np.round(rng.uniform(-1, 11, int(rng.integers(0, 20))) * 60) / 60
+        tolerance = float(rng.choice([0, 1 / 60, 0.05, 0.1, 0.5]))
+
+        mask, counts = match_shots(times, shots, tolerance)
+        expected_mask, expected_counts = loop_match(times, shots, tolerance)
+        assert mask.tolist() == expected_mask.tolist()
+        assert counts.tolist() == expected_counts
+
+
+def test_find_time_column_matches_full_scan():
+    rng = np.random.default_rng(17)
+    for _ in range(300):
+        rows = int(rng.integers(2, 3000))
+        names = [f'c{i}' for i in range(int(rng.integers(1, 9)))]
+        for i in range(len(names)):
+            if rng.random() < 0.2:
+                names[i] = 'time' if rng.random() < 0.3 else f'{names[i]}_time'
+        names = list(dict.fromkeys(names))
+        df = pd.DataFrame({name: random_column(rng, rows) for name in names})
+
+        assert find_time_column(df, sample_rows=100) == full_scan_time_column(df)
+
+
+def test_find_time_column_period_of_sample_stride():
+    # A counter that wraps every 10 rows looks constant on a 10-row stride, so
+    # screening drops it and a later column wins where the full scan would pick it
+    rows = 1000
+    df = pd.DataFrame({'tick': np.arange(rows) % 10, 'clock': np.arange(rows) * 0.01})
+
+    assert full_scan_time_column(df) == 'tick'
+    assert find_time_column(df, sample_rows=100) == 'clock'
+    assert find_time_column(df, sample_rows=rows) == 'tick'
+
+
+def test_streaming_copies_other_columns_unchanged(tmp_path):
+    source, output = tmp_path / 'log.csv', tmp_path / 'out.csv'
+    source.write_text(LOG, encoding='utf-8')
+
+    result = add_shot_column_streaming(str(source), str(output), [0.1, 0.4], 0.01, chunk_rows=2)
+
+    assert result['time_column'] == 'time'
+    assert list(result['counts']) == [1, 1]
+    rows = output.read_text(encoding='utf-8-sig').splitlines()
+    expected = LOG.splitlines()
+    assert rows[0] == expected[0] + ',shot_time'
+    assert rows[1:] == [line + (',O' if i in (1, 4) else ',') for i, line in enumerate(expected[1:])]
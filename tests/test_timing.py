@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from shotdoro.timing import StageStats
+
+
+@pytest.mark.parametrize('median', [2e-4, 5e-3, 0.08])
+def test_percentiles_match_numpy_on_sub_second_samples(median):
+    samples = np.random.default_rng(20).lognormal(np.log(median), 0.6, 20_000)
+    stats = StageStats()
+    for seconds in samples:
+        stats.add(float(seconds))
+
+    for q in (0.50, 0.95, 0.99):
+        assert stats.percentile(q) == pytest.approx(np.quantile(samples, q), rel=0.03)